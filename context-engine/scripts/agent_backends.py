@@ -0,0 +1,545 @@
+#!/usr/bin/env python3
+"""
+Zero Ambiguity Agent Backends
+
+One interface for sending a prompt to an agent, shared by orchestrator.py,
+executor.py and standards.py. The agents are described once, as backend
+configs in DEFAULT_AGENTS; a script overrides only what it needs through
+agent_configs(). Which backend an agent uses can be changed per project in
+context-engine/agents.json without touching the scripts, e.g.
+
+    {"gemini": {"backend": "pool", "serve_cmd": ["my-gemini-server"], "pool_size": 4}}
+
+Backends:
+    cli   - start the agent CLI once per prompt ("cmd", "transport" - see
+            prompt_transport.py). The default.
+    pool  - keep up to "pool_size" long-lived agent processes ("serve_cmd")
+            warm and multiplex prompts over them, one prompt per process at
+            a time, so CLI start-up and authentication are paid once.
+    http  - POST prompts to a local HTTP stand-in ("url") over a pool of
+            keep-alive connections.
+
+Pool protocol (JSON lines on the process's stdin/stdout):
+    request:   {"id": 1, "prompt": "..."}
+    response:  {"id": 1, "chunk": "..."} ... then
+               {"id": 1, "done": true, "returncode": 0, "stderr": ""}
+
+HTTP protocol: POST {"agent": name, "prompt": "..."} as JSON; a 200 response
+body is the answer, any other status is a failed call (status as exit code).
+
+Every call returns (returncode, output, stderr) - output is "" when the
+caller streams it through on_chunk, which is then never buffered - and raises
+subprocess.TimeoutExpired on timeout and OSError (e.g. FileNotFoundError)
+when the agent cannot be reached. The scripts turn failed calls into
+AgentCallError.
+"""
+
+import asyncio
+import atexit
+import http.client
+import json
+import os
+import queue
+import signal
+import socket
+import subprocess
+import threading
+import urllib.parse
+
+from prompt_transport import prompt_invocation
+
+CHUNK_BYTES = 64 * 1024
+DEFAULT_TIMEOUT = 300
+DEFAULT_POOL_SIZE = 4
+OVERRIDES_FILE = os.path.join("context-engine", "agents.json")
+
+# Agents every script can call. "transport" is how the prompt reaches the CLI
+# (argv / stdin / file - see prompt_transport.py); stdin avoids the
+# per-argument size limit and keeps prompts out of `ps`.
+DEFAULT_AGENTS = {
+    "gemini": {"backend": "cli", "cmd": ["gemini"], "transport": "stdin", "timeout": 300},
+    "auggie": {"backend": "cli", "cmd": ["auggie", "-p", "Complete the task described on stdin."],
+               "transport": "stdin", "timeout": 300},
+}
+
+
+class AgentCallError(Exception):
+    """
+    A failed agent call, raised by the scripts on top of a backend's result
+    or error. kind classifies it for retrying: "rate_limit", "transient" or
+    "hard" (never worth retrying).
+    """
+
+    def __init__(self, message: str, kind: str = "transient"):
+        super().__init__(message)
+        self.kind = kind
+
+
+def kill_process_group(proc):
+    """Kill a process together with any children it started."""
+    try:
+        os.killpg(proc.pid, signal.SIGKILL)
+    except (ProcessLookupError, PermissionError):
+        pass
+
+
+class ChunkGate:
+    """
+    Passes a reader thread's chunks to on_chunk until close(), so a thread
+    that outlives its cancelled call stops writing to a caller that has
+    stopped listening (and may have closed the file it streams into).
+    close() waits for a chunk already being handled.
+    """
+
+    def __init__(self, on_chunk):
+        self.on_chunk = on_chunk
+        self.lock = threading.Lock()
+        self.closed = False
+
+    def __call__(self, chunk: bytes):
+        with self.lock:
+            if not self.closed:
+                self.on_chunk(chunk)
+
+    def close(self):
+        with self.lock:
+            self.closed = True
+
+
+class AgentBackend:
+    """Sends prompts to one agent. Subclasses implement run()."""
+
+    kind = "base"
+
+    def __init__(self, name: str, config: dict):
+        self.name = name
+        self.config = config
+        self.timeout = config.get("timeout", DEFAULT_TIMEOUT)
+
+    @property
+    def identity(self) -> list:
+        """What, besides the prompt, determines the response (part of the cache key)."""
+        return [self.kind]
+
+    def run(self, prompt: str, timeout: float | None = None, on_chunk=None) -> tuple[int, str, str]:
+        """
+        Send prompt and wait for the answer.
+
+        Args:
+            on_chunk: Called with each piece of output (bytes) as it arrives;
+                the output is then not kept in memory
+
+        Returns:
+            (returncode, output, stderr), output "" when on_chunk is given
+        """
+        raise NotImplementedError
+
+    async def run_async(self, prompt: str, timeout: float | None = None, on_chunk=None) -> tuple[int, str, str]:
+        """run() for asyncio callers; cancelling the task abandons the call."""
+        return await asyncio.to_thread(self.run, prompt, timeout, on_chunk)
+
+    def close(self):
+        pass
+
+
+class CLIBackend(AgentBackend):
+    """A fresh agent CLI process per prompt."""
+
+    kind = "cli"
+
+    @property
+    def identity(self) -> list:
+        return self.config["cmd"]  # same key as before backends existed
+
+    def run(self, prompt, timeout=None, on_chunk=None):
+        timeout = timeout or self.timeout
+        with prompt_invocation(self.config["cmd"], prompt, self.config.get("transport", "argv")) as (cmd, stdin_text):
+            proc = subprocess.Popen(
+                cmd,
+                stdin=subprocess.PIPE if stdin_text is not None else subprocess.DEVNULL,
+                stdout=subprocess.PIPE,
+                stderr=subprocess.PIPE,
+                cwd=self.config.get("cwd"),
+                start_new_session=True,
+            )
+
+            # Feed stdin and drain stderr on threads so no pipe can fill up and block
+            def feed_stdin():
+                try:
+                    proc.stdin.write(stdin_text.encode("utf-8"))
+                except OSError:
+                    pass
+                finally:
+                    try:
+                        proc.stdin.close()
+                    except OSError:
+                        pass
+
+            stderr_parts = []
+            threads = [threading.Thread(target=lambda: stderr_parts.append(proc.stderr.read()), daemon=True)]
+            if stdin_text is not None:
+                threads.append(threading.Thread(target=feed_stdin, daemon=True))
+            for thread in threads:
+                thread.start()
+
+            timed_out = threading.Event()
+
+            def kill_on_timeout():
+                timed_out.set()
+                kill_process_group(proc)
+
+            watchdog = threading.Timer(timeout, kill_on_timeout)
+            watchdog.start()
+            output = []
+            try:
+                while chunk := proc.stdout.read1(CHUNK_BYTES):
+                    if on_chunk:
+                        on_chunk(chunk)
+                    else:
+                        output.append(chunk)
+                proc.wait()
+            finally:
+                watchdog.cancel()
+                if proc.poll() is None:
+                    kill_process_group(proc)
+                    proc.wait()
+                for thread in threads:
+                    thread.join(timeout=5)
+
+        if timed_out.is_set():
+            raise subprocess.TimeoutExpired(cmd, timeout)
+        return (proc.returncode, b"".join(output).decode("utf-8", errors="replace"),
+                b"".join(stderr_parts).decode("utf-8", errors="replace"))
+
+    async def run_async(self, prompt, timeout=None, on_chunk=None):
+        timeout = timeout or self.timeout
+        with prompt_invocation(self.config["cmd"], prompt, self.config.get("transport", "argv")) as (cmd, stdin_text):
+            proc = await asyncio.create_subprocess_exec(
+                *cmd,
+                stdin=asyncio.subprocess.PIPE if stdin_text is not None else asyncio.subprocess.DEVNULL,
+                stdout=asyncio.subprocess.PIPE,
+                stderr=asyncio.subprocess.PIPE,
+                cwd=self.config.get("cwd"),
+                start_new_session=True,
+            )
+            output = []
+
+            async def feed_stdin():
+                try:
+                    proc.stdin.write(stdin_text.encode("utf-8"))
+                    await proc.stdin.drain()
+                except (BrokenPipeError, ConnectionResetError):
+                    pass
+                finally:
+                    proc.stdin.close()
+
+            async def pump_stdout():
+                while chunk := await proc.stdout.read(CHUNK_BYTES):
+                    if on_chunk:
+                        on_chunk(chunk)
+                    else:
+                        output.append(chunk)
+
+            io_tasks = [pump_stdout(), proc.stderr.read()]
+            if stdin_text is not None:
+                io_tasks.append(feed_stdin())
+            gathered = asyncio.gather(*io_tasks, proc.wait())
+            try:
+                results = await asyncio.wait_for(gathered, timeout)
+            except asyncio.TimeoutError:
+                raise subprocess.TimeoutExpired(cmd, timeout) from None
+            finally:
+                gathered.add_done_callback(lambda f: f.cancelled() or f.exception())  # no "never retrieved" noise
+                # Timed out or cancelled: take the agent's whole process group down
+                if proc.returncode is None:
+                    kill_process_group(proc)
+                    await proc.wait()
+
+        return (proc.returncode, b"".join(output).decode("utf-8", errors="replace"),
+                results[1].decode("utf-8", errors="replace"))
+
+
+class PooledBackend(AgentBackend):
+    """Long-lived agent processes speaking the JSON-lines pool protocol."""
+
+    kind = "pool"
+
+    def __init__(self, name, config):
+        super().__init__(name, config)
+        self.size = config.get("pool_size", DEFAULT_POOL_SIZE)
+        self.idle = queue.LifoQueue()  # most recently used first, so spare processes stay cold
+        self.slots = threading.Semaphore(self.size)
+        self.procs = set()
+        self.lock = threading.Lock()
+        self.next_id = 0
+
+    @property
+    def identity(self):
+        return [self.kind, *self.config["serve_cmd"]]
+
+    def _spawn(self) -> subprocess.Popen:
+        proc = subprocess.Popen(
+            self.config["serve_cmd"],
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.DEVNULL,
+            cwd=self.config.get("cwd"),
+            start_new_session=True,
+        )
+        with self.lock:
+            self.procs.add(proc)
+        return proc
+
+    def _discard(self, proc):
+        kill_process_group(proc)
+        proc.wait()
+        with self.lock:
+            self.procs.discard(proc)
+
+    def _acquire(self) -> subprocess.Popen:
+        self.slots.acquire()
+        try:
+            while True:
+                try:
+                    proc = self.idle.get_nowait()
+                except queue.Empty:
+                    return self._spawn()
+                if proc.poll() is None:
+                    return proc
+                self._discard(proc)  # died while idle
+        except BaseException:
+            self.slots.release()
+            raise
+
+    def _release(self, proc, healthy: bool):
+        if healthy and proc.poll() is None:
+            self.idle.put(proc)
+        else:
+            self._discard(proc)
+        self.slots.release()
+
+    @staticmethod
+    def _messages(proc, request_id, prompt):
+        """Send one request to proc and yield its response lines; stops if the process dies or garbles them."""
+        try:
+            proc.stdin.write((json.dumps({"id": request_id, "prompt": prompt}) + "\n").encode("utf-8"))
+            proc.stdin.flush()
+            for line in proc.stdout:
+                message = json.loads(line)
+                if message.get("id") == request_id:
+                    yield message
+        except (OSError, ValueError):
+            return  # killed or broken pipe: reported by _exchange
+
+    def _exchange(self, proc, prompt, timeout, on_chunk):
+        """
+        Send one request to proc and read its response. Errors raised by
+        on_chunk propagate as they are; only the process's own pipe and
+        protocol failures count as the process exiting mid-request.
+        """
+        with self.lock:
+            self.next_id += 1
+            request_id = self.next_id
+        timed_out = threading.Event()
+
+        def kill_on_timeout():
+            timed_out.set()
+            kill_process_group(proc)
+
+        watchdog = threading.Timer(timeout, kill_on_timeout)
+        watchdog.start()
+        output = []
+        try:
+            for message in self._messages(proc, request_id, prompt):
+                if message.get("done"):
+                    return message.get("returncode", 0), "".join(output), message.get("stderr", "")
+                chunk = message.get("chunk", "")
+                if on_chunk:
+                    on_chunk(chunk.encode("utf-8"))
+                else:
+                    output.append(chunk)
+        finally:
+            watchdog.cancel()
+        if timed_out.is_set():
+            raise subprocess.TimeoutExpired(self.config["serve_cmd"], timeout)
+        raise BrokenPipeError(f"{self.name} pool process exited mid-request")
+
+    def run(self, prompt, timeout=None, on_chunk=None):
+        proc = self._acquire()
+        healthy = False
+        try:
+            result = self._exchange(proc, prompt, timeout or self.timeout, on_chunk)
+            healthy = True
+            return result
+        finally:
+            self._release(proc, healthy)
+
+    async def run_async(self, prompt, timeout=None, on_chunk=None):
+        acquiring = asyncio.ensure_future(asyncio.to_thread(self._acquire))
+        try:
+            proc = await asyncio.shield(acquiring)
+        except asyncio.CancelledError:
+            # Hand the process back once the waiting thread gets one
+            acquiring.add_done_callback(lambda f: f.cancelled() or f.exception() or self._release(f.result(), True))
+            raise
+        healthy = False
+        gate = ChunkGate(on_chunk) if on_chunk else None
+        try:
+            result = await asyncio.to_thread(self._exchange, proc, prompt, timeout or self.timeout, gate)
+            healthy = True
+            return result
+        except asyncio.CancelledError:
+            if gate:
+                gate.close()
+            kill_process_group(proc)  # unblocks the reader thread
+            raise
+        finally:
+            self._release(proc, healthy)
+
+    def close(self):
+        with self.lock:
+            procs = list(self.procs)
+        for proc in procs:
+            self._discard(proc)
+
+
+class HTTPBackend(AgentBackend):
+    """A local HTTP stand-in, reached over pooled keep-alive connections."""
+
+    kind = "http"
+
+    def __init__(self, name, config):
+        super().__init__(name, config)
+        self.url = urllib.parse.urlsplit(config["url"])
+        self.idle = queue.LifoQueue()
+
+    @property
+    def identity(self):
+        return [self.kind, self.config["url"], self.config.get("model", "")]
+
+    def _connection(self, timeout) -> http.client.HTTPConnection:
+        try:
+            conn = self.idle.get_nowait()
+        except queue.Empty:
+            conn = http.client.HTTPConnection(self.url.hostname, self.url.port or 80, timeout=timeout)
+        conn.timeout = timeout
+        return conn
+
+    def run(self, prompt, timeout=None, on_chunk=None):
+        timeout = timeout or self.timeout
+        return self._post(self._connection(timeout), prompt, timeout, on_chunk)
+
+    async def run_async(self, prompt, timeout=None, on_chunk=None):
+        timeout = timeout or self.timeout
+        conn = self._connection(timeout)
+        gate = ChunkGate(on_chunk) if on_chunk else None
+        try:
+            return await asyncio.to_thread(self._post, conn, prompt, timeout, gate)
+        except asyncio.CancelledError:
+            if gate:
+                gate.close()
+            # Unblocks the reader thread; the broken connection is then not reused
+            try:
+                if conn.sock:
+                    conn.sock.shutdown(socket.SHUT_RDWR)
+            except OSError:
+                pass
+            conn.close()
+            raise
+
+    def _post(self, conn, prompt, timeout, on_chunk):
+        body = json.dumps({"agent": self.name, "model": self.config.get("model"), "prompt": prompt})
+        output = []
+        reusable = False
+        try:
+            conn.request("POST", self.url.path or "/", body=body.encode("utf-8"),
+                         headers={"Content-Type": "application/json"})
+            response = conn.getresponse()
+            while chunk := response.read1(CHUNK_BYTES):
+                if response.status == 200 and on_chunk:
+                    on_chunk(chunk)
+                else:
+                    output.append(chunk)  # error bodies are kept for stderr
+            response.read()  # marks the response finished so the connection can be reused
+            reusable = not response.will_close
+        except TimeoutError:
+            raise subprocess.TimeoutExpired(self.config["url"], timeout) from None
+        finally:
+            if reusable:
+                self.idle.put(conn)
+            else:
+                conn.close()
+
+        text = b"".join(output).decode("utf-8", errors="replace")
+        if response.status == 200:
+            return 0, text, ""
+        return response.status, "", f"HTTP {response.status} {response.reason}: {text}"
+
+    def close(self):
+        while not self.idle.empty():
+            self.idle.get_nowait().close()
+
+
+BACKENDS = {backend.kind: backend for backend in (CLIBackend, PooledBackend, HTTPBackend)}
+
+
+def agent_configs(**overrides: dict) -> dict:
+    """A copy of DEFAULT_AGENTS with a script's settings merged over each agent, e.g. gemini={"timeout": 600}."""
+    return {name: {**config, **overrides.get(name, {})} for name, config in DEFAULT_AGENTS.items()}
+
+
+def load_overrides(path: str = OVERRIDES_FILE) -> dict:
+    """Per-project agent settings from agents.json, keyed by lowercase agent name."""
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            return {name.lower(): config for name, config in json.load(f).items()}
+    except FileNotFoundError:
+        return {}
+
+
+class AgentRegistry:
+    """
+    Creates each agent's backend on first use from the script's agent
+    configs merged with agents.json, and closes them all at exit.
+    Keyword arguments are defaults for every agent (e.g. cwd).
+    """
+
+    def __init__(self, configs: dict, overrides_path: str = OVERRIDES_FILE, **defaults):
+        self.configs = configs
+        self.overrides_path = overrides_path
+        self.defaults = defaults
+        self.backends = {}
+        self.lock = threading.Lock()
+        atexit.register(self.close)
+
+    def __contains__(self, name: str) -> bool:
+        return self.resolve(name) is not None
+
+    def names(self) -> list[str]:
+        return list(self.configs)
+
+    def resolve(self, name: str) -> str | None:
+        """The configured spelling of an agent name, matched case-insensitively."""
+        return next((n for n in self.configs if n.lower() == name.lower()), None)
+
+    def config(self, name: str) -> dict:
+        key = self.resolve(name)
+        if key is None:
+            raise ValueError(f"Unsupported agent: {name}. Supported: {self.names()}")
+        return {**self.defaults, **self.configs[key], **load_overrides(self.overrides_path).get(key.lower(), {})}
+
+    def get(self, name: str) -> AgentBackend:
+        with self.lock:
+            key = self.resolve(name)
+            if key not in self.backends:
+                config = self.config(name)
+                kind = config.get("backend", "cli")
+                if kind not in BACKENDS:
+                    raise ValueError(f"Unknown backend '{kind}' for {name}. Supported: {list(BACKENDS)}")
+                self.backends[key] = BACKENDS[kind](key, config)
+            return self.backends[key]
+
+    def close(self):
+        for backend in list(self.backends.values()):
+            backend.close()
+        self.backends.clear()
@@ -0,0 +1,317 @@
+#!/usr/bin/env python3
+"""
+Zero Ambiguity Benchmark
+
+Measures orchestrator and executor throughput offline. For each plan size
+it builds a throwaway project (a synthetic repo for the infrastructure
+scan, synthetic standards, domain contexts and an N-ticket implementation
+plan), puts fake gemini/auggie CLIs (fake_agent.py) first on PATH, runs
+both scripts with --profile and reports wall time, peak RSS and the
+per-stage timings from their traces.
+
+Usage:
+    python scripts/benchmark.py                          # 10, 100 and 1000 tickets
+    python scripts/benchmark.py --sizes 100 --latency 0.2 --failure-rate 0.05
+    python scripts/benchmark.py --startup 0.5 --backend pool   # Warm agent pool vs cold CLIs
+    python scripts/benchmark.py --json bench.json        # Save results
+    python scripts/benchmark.py --baseline bench.json    # Exit 1 on regressions
+
+Nothing here calls a real LLM or touches the current project.
+"""
+
+import argparse
+import json
+import os
+import random
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+from tracing import load_spans, summarize
+
+SCRIPT_DIR = Path(__file__).resolve().parent
+DEFAULT_SIZES = "10,100,1000"
+REPO_FILES_PER_TICKET = 5
+
+# Ticket types in dependency order, with the share of the plan they make up
+TICKET_MIX = [
+    ("Migration", 0.10),
+    ("Model", 0.15),
+    ("Controller", 0.20),
+    ("Route", 0.15),
+    ("Component", 0.40),
+]
+
+# Synthetic repo layout (one directory per orchestrator SCAN_DIRS category)
+REPO_DIRS = {
+    "app/Models": ".php",
+    "database/migrations": ".php",
+    "app/Http/Controllers": ".php",
+    "routes": ".php",
+    "resources/views/components": ".vue",
+}
+
+TOPICS = ["cases", "documents", "invoices", "events", "folders", "messages", "users", "billing",
+          "calendar", "notifications", "search", "permissions", "exports", "webhooks", "audit"]
+
+# Stages reported for each script, from its --profile trace
+STAGES = {
+    "orchestrator": ["index_infrastructure", "scan_infrastructure", "load_domain_contexts",
+                     "pack_context", "agent_call", "write_artifact"],
+    "executor": ["parse_plan", "build_knowledge_index", "init_jobs", "prepare_prompt", "schedule",
+                 "job", "agent_call"],
+}
+
+
+# --- SYNTHETIC PROJECT ---
+
+def lorem(rng: random.Random, words: int) -> str:
+    return " ".join(rng.choice(TOPICS + ["rule", "field", "status", "owner", "request", "record"])
+                    for _ in range(words))
+
+
+def write_repo(root: Path, files: int, rng: random.Random):
+    """Code files spread over the scanned directories; ~5% exceed the scan's line limit."""
+    dirs = list(REPO_DIRS.items())
+    for i in range(files):
+        directory, ext = dirs[i % len(dirs)]
+        path = root / directory / f"{rng.choice(TOPICS).title()}{i}{ext}"
+        path.parent.mkdir(parents=True, exist_ok=True)
+        lines = rng.randint(600, 900) if rng.random() < 0.05 else rng.randint(20, 300)
+        path.write_text("\n".join(f"// {lorem(rng, 8)}" for _ in range(lines)) + "\n", encoding="utf-8")
+
+
+def write_knowledge(root: Path, rng: random.Random):
+    """Standards and domain-context markdown, several sections per file."""
+    for directory, count in (("standards", 8), ("domain-contexts", 5)):
+        base = root / "context-engine" / directory
+        base.mkdir(parents=True, exist_ok=True)
+        for i in range(count):
+            topic = TOPICS[(i * 3) % len(TOPICS)]
+            sections = "\n\n".join(f"## {topic.title()} {j}\n\n{lorem(rng, 120)}" for j in range(8))
+            (base / f"{topic}-{i}.md").write_text(f"# {topic.title()}\n\n{sections}\n", encoding="utf-8")
+
+
+def write_specs(root: Path, rng: random.Random):
+    specs = root / "context-engine" / "specs"
+    specs.mkdir(parents=True, exist_ok=True)
+    (specs / "00-Brief.md").write_text(f"# Brief\n\n{lorem(rng, 200)}\n", encoding="utf-8")
+
+
+def write_plan(root: Path, tickets: int, rng: random.Random):
+    """An N-ticket plan in layers; each ticket depends on 1-3 tickets of the previous layer."""
+    out = ["# Implementation Plan\n"]
+    previous_layer, current_layer = [], []
+    ticket_id = 0
+    for layer, (ticket_type, share) in enumerate(TICKET_MIX):
+        count = max(1, round(tickets * share)) if layer < len(TICKET_MIX) - 1 else max(1, tickets - ticket_id)
+        for _ in range(count):
+            ticket_id += 1
+            deps = sorted(rng.sample(previous_layer, min(len(previous_layer), rng.randint(1, 3))))
+            topic = rng.choice(TOPICS)
+            out.append(
+                f"## Ticket {ticket_id}: {ticket_type} for {topic}\n\n"
+                f"**Priority:** {rng.choice(['High', 'Medium', 'Low'])}\n"
+                f"**Type:** {ticket_type}\n"
+                f"**Depends on:** {', '.join(map(str, deps)) or 'None'}\n"
+                f"**File:** `app/{topic}/{ticket_type}{ticket_id}.php`\n\n"
+                f"**Description:**\n{lorem(rng, 60)}\n\n"
+                f"**Acceptance Criteria:**\n- [ ] {lorem(rng, 8)}\n- [ ] {lorem(rng, 8)}\n\n---\n"
+            )
+            current_layer.append(ticket_id)
+        previous_layer, current_layer = current_layer, []
+    path = root / "context-engine" / "specs" / "05-implementation-plan.md"
+    path.write_text("\n".join(out), encoding="utf-8")
+
+
+def make_project(tickets: int, repo_files: int, seed: int, backend: str, pool_size: int) -> Path:
+    root = Path(tempfile.mkdtemp(prefix=f"za-bench-{tickets}-"))
+    rng = random.Random(seed)
+    shutil.copytree(SCRIPT_DIR, root / "scripts", ignore=shutil.ignore_patterns("__pycache__"))
+    write_repo(root, repo_files, rng)
+    write_knowledge(root, rng)
+    write_specs(root, rng)
+
+    # Fake agent CLIs
+    bin_dir = root / "bin"
+    bin_dir.mkdir()
+    for name in ("gemini", "auggie"):
+        wrapper = bin_dir / name
+        wrapper.write_text(f'#!/bin/sh\nexec "{sys.executable}" "{root / "scripts" / "fake_agent.py"}" '
+                           f'--as {name} "$@"\n', encoding="utf-8")
+        wrapper.chmod(0o755)
+
+    # Or long-lived fake agents behind the pool backend
+    if backend == "pool":
+        agents = {name: {"backend": "pool", "pool_size": pool_size,
+                         "serve_cmd": [sys.executable, str(root / "scripts" / "fake_agent.py"), "--as", name, "--serve"]}
+                  for name in ("gemini", "auggie")}
+        (root / "context-engine" / "agents.json").write_text(json.dumps(agents, indent=2), encoding="utf-8")
+    return root
+
+
+# --- MEASUREMENT ---
+
+def run_measured(cmd: list[str], cwd: Path, env: dict, log_path: Path) -> dict:
+    """Run a command to completion; wall time and peak RSS of it and its children."""
+    start = time.perf_counter()
+    with open(log_path, "w", encoding="utf-8") as log:
+        proc = subprocess.Popen(cmd, cwd=str(cwd), env=env, stdin=subprocess.DEVNULL, stdout=log, stderr=log)
+        _, status, usage = os.wait4(proc.pid, 0)
+    proc.returncode = os.waitstatus_to_exitcode(status)
+    return {
+        "exit_code": proc.returncode,
+        "wall_s": round(time.perf_counter() - start, 3),
+        "peak_rss_mb": round(usage.ru_maxrss / 1024, 1),  # ru_maxrss is in KiB on Linux
+    }
+
+
+def stage_timings(trace_dir: Path, script: str) -> dict:
+    """Per-stage totals and percentiles from the script's latest trace."""
+    traces = sorted(trace_dir.glob(f"{script}-*.jsonl"), key=lambda p: p.stat().st_mtime)
+    if not traces:
+        return {}
+    rows = {r["name"]: r for r in summarize(load_spans(str(traces[-1])))}
+    return {
+        name: {k: round(rows[name][k], 1) for k in ("count", "total_ms", "p50_ms", "p95_ms")}
+        for name in STAGES[script] if name in rows
+    }
+
+
+def bench_size(tickets: int, args) -> dict:
+    """Build a project for one plan size and run orchestrator and executor on it."""
+    repo_files = tickets * args.repo_files_per_ticket
+    root = make_project(tickets, repo_files, args.seed, args.backend, args.max_parallel)
+    env = {
+        **os.environ,
+        "PATH": f"{root / 'bin'}{os.pathsep}{os.environ.get('PATH', '')}",
+        "ZA_FAKE_LATENCY": str(args.latency),
+        "ZA_FAKE_OUTPUT_BYTES": str(args.output_bytes),
+        "ZA_FAKE_FAILURE_RATE": str(args.failure_rate),
+        "ZA_FAKE_TAIL_RATE": str(args.tail_rate),
+        "ZA_FAKE_STARTUP": str(args.startup),
+        "ZA_FAKE_SEED": str(args.seed),
+    }
+    trace_dir = root / "context-engine" / ".cache" / "traces"
+    result = {"tickets": tickets, "repo_files": repo_files, "backend": args.backend, "project": str(root)}
+
+    try:
+        if not args.skip_orchestrator:
+            print(f"   🏛️  orchestrator ({repo_files} repo files)...")
+            result["orchestrator"] = run_measured(
+                [sys.executable, "scripts/orchestrator.py", "--force", "--no-cache", "--profile"],
+                root, env, root / "orchestrator.log")
+            result["orchestrator"]["stages"] = stage_timings(trace_dir, "orchestrator")
+
+        # The orchestrator wrote a plan from fake output; replace it with the synthetic one
+        write_plan(root, tickets, random.Random(args.seed))
+        print(f"   🚀 executor ({tickets} tickets, max {args.max_parallel} in parallel, {args.runner})...")
+        result["executor"] = run_measured(
+            [sys.executable, "scripts/executor.py", "--no-cache", "--profile",
+             "--max-parallel", str(args.max_parallel), "--runner", args.runner],
+            root, env, root / "executor.log")
+        result["executor"]["stages"] = stage_timings(trace_dir, "executor")
+    finally:
+        if not args.keep:
+            shutil.rmtree(root, ignore_errors=True)
+    return result
+
+
+# --- REPORTING ---
+
+def print_report(results: list[dict]):
+    print("\n" + "=" * 72)
+    print("📊 BENCHMARK RESULTS")
+    print("=" * 72)
+    for result in results:
+        for script in ("orchestrator", "executor"):
+            run = result.get(script)
+            if not run:
+                continue
+            status = "" if run["exit_code"] == 0 else f"  ❌ exit {run['exit_code']} (see {script}.log)"
+            print(f"\n{script} - {result['tickets']} tickets, {result['repo_files']} repo files, "
+                  f"{result.get('backend', 'cli')} backend: "
+                  f"{run['wall_s']:.2f}s wall, {run['peak_rss_mb']:.1f} MB peak RSS{status}")
+            for name, stage in run["stages"].items():
+                print(f"    {name:<24} x{stage['count']:<6g} total {stage['total_ms'] / 1000:8.3f}s   "
+                      f"p50 {stage['p50_ms']:9.1f} ms   p95 {stage['p95_ms']:9.1f} ms")
+
+
+def find_regressions(results: list[dict], baseline: list[dict], tolerance: float) -> list[str]:
+    """Wall time or peak RSS more than `tolerance` (relative) above the baseline."""
+    previous = {(r["tickets"], script): r[script] for r in baseline
+                for script in ("orchestrator", "executor") if r.get(script)}
+    regressions = []
+    for result in results:
+        for script in ("orchestrator", "executor"):
+            run, base = result.get(script), previous.get((result["tickets"], script))
+            if not run or not base:
+                continue
+            for metric in ("wall_s", "peak_rss_mb"):
+                if base[metric] and run[metric] > base[metric] * (1 + tolerance):
+                    regressions.append(f"{script} @ {result['tickets']} tickets: {metric} "
+                                       f"{base[metric]} -> {run[metric]} (+{run[metric] / base[metric] - 1:.0%})")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Zero Ambiguity Benchmark (offline, fake agents)")
+    parser.add_argument("--sizes", default=DEFAULT_SIZES, help=f"Plan sizes in tickets (default: {DEFAULT_SIZES})")
+    parser.add_argument("--repo-files-per-ticket", type=int, default=REPO_FILES_PER_TICKET,
+                        help=f"Synthetic repo size per ticket (default: {REPO_FILES_PER_TICKET})")
+    parser.add_argument("--latency", type=float, default=0.05, help="Mean fake agent latency in seconds")
+    parser.add_argument("--output-bytes", type=int, default=2000, help="Fake agent response size")
+    parser.add_argument("--failure-rate", type=float, default=0.0, help="Fraction of fake calls that fail")
+    parser.add_argument("--tail-rate", type=float, default=0.0, help="Fraction of fake calls that are 10x slower")
+    parser.add_argument("--startup", type=float, default=0.0,
+                        help="Fake agent start-up time in seconds (the cold start pooling avoids)")
+    parser.add_argument("--backend", choices=["cli", "pool"], default="cli",
+                        help="Agent backend: a fake CLI per call, or a pool of long-lived fake agents")
+    parser.add_argument("--max-parallel", type=int, default=16, help="Executor --max-parallel (default: 16)")
+    parser.add_argument("--runner", default="asyncio", help="Executor --runner (default: asyncio)")
+    parser.add_argument("--skip-orchestrator", action="store_true", help="Only benchmark the executor")
+    parser.add_argument("--seed", type=int, default=7, help="Seed for the synthetic project")
+    parser.add_argument("--keep", action="store_true", help="Keep the generated projects for inspection")
+    parser.add_argument("--json", metavar="PATH", help="Write results as JSON")
+    parser.add_argument("--baseline", metavar="PATH", help="Compare against a previous --json output")
+    parser.add_argument("--tolerance", type=float, default=0.25,
+                        help="Allowed relative slowdown against --baseline (default: 0.25)")
+    args = parser.parse_args()
+
+    results = []
+    for size in (int(s) for s in args.sizes.split(",") if s.strip()):
+        print(f"\n⏱️  Benchmarking {size} ticket(s)...")
+        results.append(bench_size(size, args))
+        if args.keep:
+            print(f"   📁 Project kept at {results[-1]['project']}")
+
+    print_report(results)
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump({"args": vars(args), "results": results}, f, indent=2)
+        print(f"\n💾 Results saved to {args.json}")
+
+    failed = [f"{script} @ {r['tickets']} tickets" for r in results for script in ("orchestrator", "executor")
+              if r.get(script) and r[script]["exit_code"] != 0]
+    if failed:
+        print(f"\n❌ Failed runs: {', '.join(failed)}")
+        sys.exit(1)
+
+    if args.baseline:
+        with open(args.baseline, "r", encoding="utf-8") as f:
+            baseline = json.load(f)["results"]
+        regressions = find_regressions(results, baseline, args.tolerance)
+        if regressions:
+            print(f"\n❌ {len(regressions)} regression(s) beyond {args.tolerance:.0%}:")
+            for line in regressions:
+                print(f"   {line}")
+            sys.exit(1)
+        print(f"\n✅ No regressions beyond {args.tolerance:.0%} against {args.baseline}")
+
+
+if __name__ == "__main__":
+    main()
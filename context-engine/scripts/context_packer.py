@@ -0,0 +1,98 @@
+#!/usr/bin/env python3
+"""
+Zero Ambiguity Context Packer
+
+Fits prompt context into a model's window by whole documents instead of
+hard character cuts.
+
+A context is a list of sections. Each section is one document (a Brief, a
+domain context file, a scanned source file, a spec) with a group header
+and a priority (lower = more important). The packer keeps the most
+important sections that fit in the token budget, drops the rest whole,
+and reports what it left out. Kept sections are rendered in their
+original order, grouped under "--- GROUP ---" headers.
+"""
+
+import math
+
+CHARS_PER_TOKEN = 4  # Rough estimate for English prose and code
+OUTPUT_RESERVE_TOKENS = 8192  # Leave room for the model's answer
+
+# Section priorities (lower is kept first)
+PRIORITY_BRIEF = 0
+PRIORITY_SPEC = 1
+PRIORITY_DOMAIN = 2
+PRIORITY_CODE = 3
+
+
+def estimate_tokens(text: str) -> int:
+    """Estimate the token count of text."""
+    return math.ceil(len(text) / CHARS_PER_TOKEN)
+
+
+def make_section(group: str, text: str | None, priority: int, title: str | None = None) -> dict:
+    """Build a section dict for pack_sections() (missing text becomes empty)."""
+    text = text or ""
+    return {
+        "group": group,
+        "title": title or group,
+        "text": text,
+        "priority": priority,
+        "tokens": estimate_tokens(text),
+    }
+
+
+def sections_text(sections: list[dict]) -> str:
+    """Concatenate the raw text of sections (e.g. for hashing)."""
+    return "".join(s["text"] for s in sections)
+
+
+def context_budget(window_tokens: int, overhead: str = "") -> int:
+    """Tokens available for context after the prompt overhead and output reserve."""
+    return max(0, window_tokens - OUTPUT_RESERVE_TOKENS - estimate_tokens(overhead))
+
+
+def pack_sections(sections: list[dict], budget_tokens: int) -> tuple[list[dict], list[dict]]:
+    """
+    Select whole sections by priority until the budget is spent.
+
+    Sections are considered in priority order (ties keep their original
+    order); any section that does not fit in what is left is dropped, but
+    smaller lower-priority sections may still be kept after it.
+
+    Returns:
+        (kept, dropped) - kept in original order, dropped in priority order.
+    """
+    order = sorted(range(len(sections)), key=lambda i: sections[i]["priority"])
+    remaining = budget_tokens
+    kept_ids = set()
+    dropped = []
+    for i in order:
+        section = sections[i]
+        if section["tokens"] <= remaining:
+            kept_ids.add(i)
+            remaining -= section["tokens"]
+        else:
+            dropped.append(section)
+    kept = [s for i, s in enumerate(sections) if i in kept_ids]
+    return kept, dropped
+
+
+def render_sections(sections: list[dict]) -> str:
+    """Render sections under one "--- GROUP ---" header per group."""
+    parts = []
+    current_group = None
+    for section in sections:
+        if section["group"] != current_group:
+            current_group = section["group"]
+            parts.append(f"\n\n--- {current_group} ---\n")
+        parts.append(section["text"] + "\n")
+    return "".join(parts).strip()
+
+
+def describe_dropped(dropped: list[dict], limit: int = 5) -> str:
+    """One-line summary of dropped sections for console output."""
+    titles = [s["title"] for s in dropped[:limit]]
+    more = f" (+{len(dropped) - limit} more)" if len(dropped) > limit else ""
+    tokens = sum(s["tokens"] for s in dropped)
+    return f"{len(dropped)} section(s), ~{tokens} tokens: {', '.join(titles)}{more}"
@@ -7,18 +7,38 @@ Deploys sub-agents to execute tickets from the Implementation Plan.
 Usage:
     python scripts/executor.py                    # Execute all pending tickets
     python scripts/executor.py --ticket 1         # Execute specific ticket
+    python scripts/executor.py --retry-failed     # Re-run tickets that failed in the latest execution
     python scripts/executor.py --status           # Check status of all jobs
+    python scripts/executor.py --status --ticket 3  # Run history of one ticket
+    python scripts/executor.py --rebuild-registry # Re-index subagent_runs/ into the job registry
+    python scripts/executor.py --report JOB_ID    # Print a job's report (archived jobs too)
+    python scripts/executor.py --compact          # Archive old finished jobs (--keep-days/--keep-last)
     python scripts/executor.py --agent gemini     # Use specific agent (default: gemini)
+    python scripts/executor.py --max-parallel 2   # Limit concurrent sub-agents (default: 4)
+    python scripts/executor.py --runner detached  # One worker process per ticket (default: asyncio)
+    python scripts/executor.py --hedge auggie     # Re-send slow (p95) gemini calls to auggie
+    python scripts/executor.py --cache            # Serve cached agent responses (see below)
+    python scripts/executor.py --no-cache         # Bypass the agent response cache
+    python scripts/executor.py --profile          # Record a timing trace and print a profile
 
 Workflow:
     1. Reads 05-implementation-plan.md
-    2. Parses tickets (marked with ## Ticket format)
+    2. Parses tickets (marked with ## Ticket format) and their dependencies
+       (explicit **Depends on:** lines, otherwise inferred DB → API → UI)
     3. For each ticket, spawns a sub-agent with:
        - Ticket description
        - Relevant specs (schema, API contract)
-       - Relevant standards
-       - Domain contexts
-    4. Tracks job completion in subagent_runs/
+       - Standards and domain-context sections retrieved for the ticket
+         (BM25 over its title, type, file path and description)
+    4. Queues jobs and admits a new sub-agent once all of its prerequisites
+       have completed and one of the --max-parallel slots is free; agents
+       run under an in-process asyncio supervisor or as detached workers
+    5. Tracks job state (queued -> running -> completed/failed) in subagent_runs/
+
+Sub-agents edit the working tree, and a cached report does not: by default
+fresh responses are only stored in the LLM cache, never served from it. Pass
+--cache to reuse them, e.g. when re-running a plan whose edits are still in
+place.
 
 IMPORTANT: Sub-agents are STATELESS
 - Instructions must be COMPLETE and SELF-CONTAINED
@@ -28,19 +48,38 @@ See guides/executor-workflow.md for detailed explanation.
 """
 
 import argparse
+import asyncio
+import hashlib
 import json
 import os
+import random
 import re
+import shutil
+import sqlite3
 import subprocess
 import sys
+import tempfile
+import threading
 import time
 import uuid
-from datetime import datetime
+import zipfile
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from datetime import datetime, timedelta
 from pathlib import Path
 
+from context_packer import estimate_tokens
+from job_registry import JobRegistry
+from llm_cache import LLMCache, cache_key, mode_from_flags
+from agent_backends import AgentCallError, AgentRegistry, agent_configs
+from retrieval import BM25Index, split_markdown_sections
+import tracing
+
 # --- CONFIGURATION ---
 ROOT = Path(__file__).resolve().parent.parent
 RUNS_DIR = ROOT / "subagent_runs"
+REGISTRY = JobRegistry(RUNS_DIR / "registry.db")
+ARCHIVE_DIR = RUNS_DIR / "archive"
+CACHE_DIR = ROOT / "context-engine" / ".cache" / "llm"
 
 DIRS = {
     "SPECS": ROOT / "context-engine" / "specs",
@@ -56,20 +95,112 @@ FILES = {
     "EXECUTION_STATUS": DIRS["SPECS"] / "06-execution-status.json",
 }
 
-# Supported agents
-AGENTS = {
-    "gemini": {
-        "cmd": ["gemini", "-p", "{prompt}", "-m", "gemini-2.5-flash", "-y"],
-        "timeout": 320,
-    },
-    "auggie": {
-        "cmd": ["auggie", "-p", "{prompt}"],
-        "timeout": 300,
-    },
+# Sub-agents edit files unattended, so gemini runs on the flash model with
+# tool calls auto-approved (-y). "retry" overrides RETRY_DEFAULTS for the agent.
+AGENTS = agent_configs(
+    gemini={"cmd": ["gemini", "-m", "gemini-2.5-flash", "-y"], "timeout": 320,
+            "retry": {"rate_limit_attempts": 6}},
+)
+AGENT_BACKENDS = AgentRegistry(AGENTS, ROOT / "context-engine" / "agents.json", cwd=str(ROOT))
+
+# Retry policy for failed agent calls. Delays grow exponentially from
+# *_base_delay (seconds), are capped at max_delay and jittered by +/-50%.
+# Rate-limit failures back off longer and get more attempts; hard failures
+# (bad credentials, unknown flags, missing CLI) are never retried.
+RETRY_DEFAULTS = {
+    "attempts": 3,
+    "base_delay": 2.0,
+    "rate_limit_attempts": 5,
+    "rate_limit_base_delay": 15.0,
+    "max_delay": 120.0,
 }
+RATE_LIMIT_RE = re.compile(r"rate.?limit|too many requests|\b429\b|quota|resource.?exhausted", re.IGNORECASE)
+HARD_FAILURE_RE = re.compile(
+    r"unauthori[sz]ed|\b401\b|\b403\b|forbidden|invalid api key|api key not|not logged in|"
+    r"unknown (option|argument|flag)|unrecognized arguments|permission denied",
+    re.IGNORECASE,
+)
 
 DEFAULT_AGENT = "gemini"
 
+# Dependency layers used when a ticket has no explicit "**Depends on:**" line.
+# A ticket depends on every ticket in the nearest lower layer present in the plan.
+TYPE_LAYERS = [
+    ("database", ["migration", "database", "schema", "seeder"]),
+    ("model", ["model", "factory"]),
+    ("api", ["controller", "api", "endpoint", "route", "service", "request", "middleware", "policy"]),
+    ("ui", ["component", "view", "ui", "page", "livewire", "blade"]),
+]
+
+# Per-ticket retrieval budgets, in tokens
+TICKET_DOMAIN_BUDGET = 6000
+TICKET_STANDARDS_BUDGET = 6000
+
+# Sections shared by every ticket prompt: name -> (source file, template)
+SHARED_SECTIONS = {
+    "schema": (FILES["SCHEMA"], "## Database Schema\n```sql\n{content}\n```"),
+    "api": (FILES["API"], "## API Contract\n```json\n{content}\n```"),
+    "infra": (FILES["INFRA"], "## Existing Infrastructure\n{content}"),
+}
+
+# Worker output streaming
+STREAM_CHUNK_BYTES = 64 * 1024
+
+# Scheduler settings
+DEFAULT_MAX_PARALLEL = 4
+PROMPT_BUILDERS = 4  # threads assembling ticket prompts ahead of the scheduler
+POLL_INTERVAL = 0.5  # seconds between worker liveness checks
+
+# Retention for --compact: finished jobs stay as directories only while they
+# are among the newest KEEP_LAST jobs and younger than KEEP_DAYS; older ones
+# are packed into per-day archives, which are deleted after ARCHIVE_DAYS.
+DEFAULT_KEEP_DAYS = 14
+DEFAULT_KEEP_LAST = 200
+DEFAULT_ARCHIVE_DAYS = 90
+FINISHED_STATES = ("completed", "failed", "blocked", "cancelled")
+
+# Hedging (--hedge AGENT): if the primary agent has not answered after the
+# --hedge-percentile of its past call durations, the prompt is also sent to
+# the hedge agent; the first valid response wins and the other is killed.
+DEFAULT_HEDGE_PERCENTILE = 95
+HEDGE_MIN_SAMPLES = 20  # past durations needed before the percentile is trusted
+HEDGE_FALLBACK_DELAY = 120.0  # seconds, used until then
+HEDGE_REPORT = "report.hedge.md"
+
+# How agents are run:
+#   asyncio  - one supervisor process runs every agent CLI in an event loop
+#   detached - each ticket gets its own worker process (executor.py --worker),
+#              which keeps running if the scheduler is interrupted
+RUNNERS = ("asyncio", "detached")
+DEFAULT_RUNNER = "asyncio"
+
+
+# Plan parsing. Parsed tickets are cached in PLAN_CACHE under the plan's
+# hash; bump PLAN_PARSER_VERSION whenever parse_tickets() output changes.
+PLAN_CACHE = ROOT / "context-engine" / ".cache" / "plan-tickets.json"
+PLAN_PARSER_VERSION = 4
+# A closing run of #s needs whitespace before it: "### Ticket 4: Port the C#" keeps its "#"
+PLAN_HEADING_RE = re.compile(r'^(#{1,6})\s+(.*?)(?:\s+#+)?\s*$')
+# "Ticket 3: Title", "Ticket 3 - Title", "Ticket 3", "**Ticket 3:** Title" or
+# "**Ticket 3** Title" - but not a sub-heading such as "Ticket 3 review notes"
+TICKET_HEADING_RE = re.compile(
+    r'^(?:\*\*Ticket\s+#?(\d+)\s*[:.\-–—]?\s*\*\*\s*[:.\-–—]?'
+    r'|Ticket\s+#?(\d+)\s*(?:[:.\-–—]|$))\s*(.*)$',
+    re.IGNORECASE,
+)
+PLAN_FIELD_RE = re.compile(r'^\s*(?:[-*]\s+)?\*\*([^*:]+?):?\*\*\s*:?\s*(.*)$')
+PLAN_FIELDS = {
+    "priority": "priority",
+    "type": "type",
+    "file": "file",
+    "files": "file",
+    "depends on": "depends_on",
+    "dependencies": "depends_on",
+    "description": "description",
+    "acceptance criteria": "criteria",
+}
+CRITERION_RE = re.compile(r'^\s*-\s+\[ \]\s+(.+)$')
+
 
 # --- UTILITY FUNCTIONS ---
 
@@ -85,8 +216,16 @@ def read_file(path: Path) -> str | None:
 
 def write_json(path: Path, data: dict):
     path.parent.mkdir(parents=True, exist_ok=True)
-    with open(path, "w", encoding="utf-8") as f:
-        json.dump(data, f, indent=2)
+    # Write atomically: status.json is updated mid-run and read by --status.
+    # The temp file is unique per call, as backends write from their own threads.
+    fd, tmp_path = tempfile.mkstemp(prefix=f".{path.name}.", suffix=".tmp", dir=path.parent)
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            json.dump(data, f, indent=2)
+        os.replace(tmp_path, path)
+    except BaseException:
+        os.unlink(tmp_path)
+        raise
 
 
 def load_json(path: Path) -> dict | None:
@@ -96,11 +235,61 @@ def load_json(path: Path) -> dict | None:
     return None
 
 
+# --- SHARED CONTEXT CACHE ---
+# Files and rendered sections are loaded once per run and reused by every
+# ticket; entries are invalidated when the file's mtime or size changes.
+
+_FILE_CACHE = {}  # path -> ((mtime_ns, size), content)
+_SECTION_CACHE = {}  # section name -> ((mtime_ns, size), rendered)
+_KNOWLEDGE_CACHE = {"signature": None, "index": None}
+_CACHE_LOCK = threading.RLock()  # reentrant: the index is built from read_cached() under it
+
+
+def file_signature(path: Path) -> tuple[int, int] | None:
+    try:
+        stat = path.stat()
+    except FileNotFoundError:
+        return None
+    return stat.st_mtime_ns, stat.st_size
+
+
+def read_cached(path: Path) -> str | None:
+    """read_file() backed by an in-memory cache invalidated by mtime and size."""
+    signature = file_signature(path)
+    if signature is None:
+        return None
+    with _CACHE_LOCK:
+        cached = _FILE_CACHE.get(path)
+    if cached and cached[0] == signature:
+        return cached[1]
+    content = path.read_text(encoding="utf-8")
+    with _CACHE_LOCK:
+        _FILE_CACHE[path] = (signature, content)
+    return content
+
+
+def shared_section(name: str) -> str:
+    """Render one of SHARED_SECTIONS, reusing the last rendering while its file is unchanged."""
+    path, template = SHARED_SECTIONS[name]
+    signature = file_signature(path)
+    if signature is None:
+        return ""
+    with _CACHE_LOCK:
+        cached = _SECTION_CACHE.get(name)
+    if cached and cached[0] == signature:
+        return cached[1]
+    content = read_cached(path)
+    rendered = template.format(content=content) if content else ""
+    with _CACHE_LOCK:
+        _SECTION_CACHE[name] = (signature, rendered)
+    return rendered
+
+
 # --- PLAN PARSING ---
 
 def parse_tickets(plan_content: str) -> list[dict]:
     """
-    Parse tickets from the Implementation Plan.
+    Parse tickets from the Implementation Plan in one pass over its lines.
 
     Expected format:
     ## Ticket 1: [Title]
@@ -113,120 +302,309 @@ def parse_tickets(plan_content: str) -> list[dict]:
     **Acceptance Criteria:**
     - [ ] Criterion 1
     - [ ] Criterion 2
+
+    Optional:
+    **Depends on:** 1, 3   (or "None")
+
+    Ticket headings may use any heading level. A ticket ends at the next ticket
+    heading or at any other heading of the same or a higher level. Field
+    labels are only recognised at the start of a line. Only the labels in
+    PLAN_FIELDS end a description or criteria list; other bold text (e.g.
+    "- **email**: string, unique") stays in the description. Nothing inside
+    ``` fences is interpreted.
+
+    Raises ValueError if two tickets share an ID.
     """
     tickets = []
+    ticket = None
+    section = None  # field collecting the following lines: "description", "criteria" or None
+    in_fence = False
 
-    # Split by ticket headers
-    ticket_pattern = r'## Ticket (\d+): (.+?)(?=## Ticket \d+:|$)'
-    matches = re.findall(ticket_pattern, plan_content, re.DOTALL)
-
-    for ticket_num, ticket_content in matches:
-        ticket = {
-            "id": int(ticket_num),
-            "raw_content": ticket_content.strip(),
-        }
-
-        # Extract title (first line after the header match)
-        title_match = re.match(r'^(.+?)(?:\n|$)', ticket_content.strip())
-        ticket["title"] = title_match.group(1).strip() if title_match else f"Ticket {ticket_num}"
-
-        # Extract priority
-        priority_match = re.search(r'\*\*Priority:\*\*\s*(\w+)', ticket_content)
-        ticket["priority"] = priority_match.group(1) if priority_match else "Medium"
-
-        # Extract type
-        type_match = re.search(r'\*\*Type:\*\*\s*(.+?)(?:\n|$)', ticket_content)
-        ticket["type"] = type_match.group(1).strip() if type_match else "Unknown"
-
-        # Extract file path
-        file_match = re.search(r'\*\*File:\*\*\s*`?([^`\n]+)`?', ticket_content)
-        ticket["file"] = file_match.group(1).strip() if file_match else None
-
-        # Extract description
-        desc_match = re.search(r'\*\*Description:\*\*\s*(.+?)(?=\*\*Acceptance Criteria:\*\*|$)',
-                               ticket_content, re.DOTALL)
-        ticket["description"] = desc_match.group(1).strip() if desc_match else ticket_content
-
-        # Extract acceptance criteria
-        criteria_match = re.search(r'\*\*Acceptance Criteria:\*\*\s*(.+?)$', ticket_content, re.DOTALL)
-        if criteria_match:
-            criteria_text = criteria_match.group(1)
-            ticket["acceptance_criteria"] = re.findall(r'- \[ \] (.+?)(?:\n|$)', criteria_text)
-        else:
-            ticket["acceptance_criteria"] = []
-
+    def finish():
+        if ticket is None:
+            return
+        lines = ticket.pop("lines")
+        body = "\n".join(lines).strip()
+        ticket["raw_content"] = "\n".join([ticket["title"], *lines]).strip()
+        description = "\n".join(ticket.pop("description_lines")).strip()
+        ticket["description"] = description or body
         tickets.append(ticket)
 
+    for line in plan_content.splitlines():
+        if line.lstrip().startswith("```"):
+            in_fence = not in_fence
+        heading = None if in_fence else PLAN_HEADING_RE.match(line)
+
+        if heading:
+            ticket_heading = TICKET_HEADING_RE.match(heading.group(2))
+            if ticket_heading:
+                finish()
+                ticket_id = ticket_heading.group(1) or ticket_heading.group(2)
+                ticket = {
+                    "id": int(ticket_id),
+                    "title": ticket_heading.group(3) or f"Ticket {ticket_id}",
+                    "priority": "Medium",
+                    "type": "Unknown",
+                    "file": None,
+                    "depends_on": None,  # None means "inherit from type layer"
+                    "acceptance_criteria": [],
+                    "level": len(heading.group(1)),
+                    "lines": [],
+                    "description_lines": [],
+                }
+                section = None
+                continue
+            if ticket is not None and len(heading.group(1)) <= ticket["level"]:
+                finish()  # e.g. "## Phase 2" after a "## Ticket"
+                ticket = None
+                continue
+
+        if ticket is None:
+            continue
+        ticket["lines"].append(line)
+
+        field = None if in_fence else PLAN_FIELD_RE.match(line)
+        label = field and PLAN_FIELDS.get(field.group(1).strip().lower())
+        if label:
+            value = field.group(2).strip()
+            section = None
+            if label == "priority":
+                word = re.match(r'\w+', value)
+                if word:
+                    ticket["priority"] = word.group(0)
+            elif label == "type":
+                ticket["type"] = value or ticket["type"]
+            elif label == "file":
+                ticket["file"] = value.strip("`").strip() or None
+            elif label == "depends_on":
+                ticket["depends_on"] = [int(n) for n in re.findall(r'\d+', value)]
+            elif label == "description":
+                section = "description"
+                if value:
+                    ticket["description_lines"].append(value)
+            elif label == "criteria":
+                section = "criteria"
+            continue
+
+        if section == "description":
+            ticket["description_lines"].append(line)
+        elif section == "criteria" and not in_fence:
+            item = CRITERION_RE.match(line)
+            if item:
+                ticket["acceptance_criteria"].append(item.group(1).strip())
+
+    finish()
+    for t in tickets:
+        del t["level"]
+
+    seen = set()
+    for t in tickets:
+        if t["id"] in seen:
+            raise ValueError(f"Ticket {t['id']} appears more than once in the Implementation Plan")
+        seen.add(t["id"])
+
     return tickets
 
 
+def load_tickets(plan_content: str) -> list[dict]:
+    """
+    Parsed tickets with dependencies resolved, served from PLAN_CACHE while
+    the plan is unchanged (keyed by its SHA-256 and PLAN_PARSER_VERSION).
+    """
+    plan_hash = hashlib.sha256(plan_content.encode("utf-8")).hexdigest()
+    tickets = None
+    try:
+        with open(PLAN_CACHE, "r", encoding="utf-8") as f:
+            cached = json.load(f)
+        if cached.get("plan_sha256") == plan_hash and cached.get("parser_version") == PLAN_PARSER_VERSION:
+            tickets = cached["tickets"]
+    except (OSError, ValueError, KeyError):
+        pass
+
+    if tickets is None:
+        tickets = parse_tickets(plan_content)
+        try:
+            write_json(PLAN_CACHE, {"plan_sha256": plan_hash, "parser_version": PLAN_PARSER_VERSION,
+                                    "parsed_at": now_iso(), "tickets": tickets})
+        except OSError as e:
+            print(f"⚠️  Could not cache the parsed plan: {e}")
+        tracing.annotate(cache="miss")
+    else:
+        tracing.annotate(cache="hit")
+
+    resolve_dependencies(tickets)
+    return tickets
+
+
+def ticket_layer(ticket_type: str) -> int | None:
+    """Map a ticket's **Type:** to its index in TYPE_LAYERS, or None if unknown."""
+    words = re.findall(r'[a-z]+', ticket_type.lower())
+    for index, (_, keywords) in enumerate(TYPE_LAYERS):
+        if any(word in keywords for word in words):
+            return index
+    return None
+
+
+def resolve_dependencies(tickets: list[dict]):
+    """
+    Fill in each ticket's depends_on list.
+
+    Explicit "**Depends on:**" lines win. Otherwise a ticket depends on all
+    tickets of the nearest lower layer (DB → Model → API → UI) in the plan.
+    References to tickets that are not in the plan are dropped.
+    """
+    known_ids = {t["id"] for t in tickets}
+    layers = {}
+    for t in tickets:
+        layer = ticket_layer(t["type"])
+        if layer is not None:
+            layers.setdefault(layer, []).append(t["id"])
+
+    for t in tickets:
+        if t["depends_on"] is None:
+            layer = ticket_layer(t["type"])
+            lower = [l for l in layers if layer is not None and l < layer]
+            t["depends_on"] = list(layers[max(lower)]) if lower else []
+            t["depends_source"] = "inferred"
+        else:
+            unknown = [d for d in t["depends_on"] if d not in known_ids or d == t["id"]]
+            if unknown:
+                print(f"⚠️  Ticket {t['id']}: ignoring unknown dependencies {unknown}")
+            t["depends_on"] = [d for d in t["depends_on"] if d not in unknown]
+            t["depends_source"] = "explicit"
+
+
+def topological_order(tickets: list[dict]) -> list[dict]:
+    """
+    Order tickets so every ticket follows its prerequisites (Kahn's algorithm).
+
+    Ties keep plan order. Raises ValueError if two tickets share an ID or
+    the dependencies form a cycle.
+    """
+    by_id = {}
+    for t in tickets:
+        if t["id"] in by_id:
+            raise ValueError(f"Ticket {t['id']} appears more than once in the Implementation Plan")
+        by_id[t["id"]] = t
+    remaining = {t["id"]: {d for d in t["depends_on"] if d in by_id} for t in tickets}
+    ordered = []
+    while remaining:
+        ready = [t["id"] for t in tickets if t["id"] in remaining and not remaining[t["id"]]]
+        if not ready:
+            raise ValueError(f"Dependency cycle between tickets {sorted(remaining)}")
+        for ticket_id in ready:
+            del remaining[ticket_id]
+            ordered.append(by_id[ticket_id])
+        for deps in remaining.values():
+            deps.difference_update(ready)
+    return ordered
+
+
 # --- CONTEXT BUILDING ---
 
-def load_standards() -> str:
-    """Load coding standards for the sub-agent."""
+def load_standards_chunks() -> list[dict]:
+    """Split the coding standards into heading sections for retrieval."""
     standards_dir = DIRS["STANDARDS"]
     if not standards_dir.exists():
-        return ""
+        return []
 
-    standards = []
-    for file in standards_dir.glob("*.md"):
-        content = read_file(file)
+    chunks = []
+    for file in sorted(standards_dir.glob("*.md")):
+        content = read_cached(file)
         if content:
-            standards.append(f"### {file.name}\n{content}")
-
-    return "\n\n".join(standards) if standards else ""
+            chunks.extend(dict(c, kind="standards") for c in split_markdown_sections(content, file.name))
+    return chunks
 
 
-def load_domain_contexts() -> str:
-    """Load domain contexts for business rules and code navigation."""
+def load_domain_context_chunks() -> list[dict]:
+    """Split the domain contexts (business rules and code navigation) into heading sections."""
     contexts_dir = DIRS["DOMAIN_CONTEXTS"]
     if not contexts_dir.exists():
-        return ""
+        return []
 
-    contexts = []
-    for file in contexts_dir.glob("*.md"):
+    chunks = []
+    for file in sorted(contexts_dir.glob("*.md")):
         # Skip README
         if file.name == "README.md":
             continue
-        content = read_file(file)
+        content = read_cached(file)
         if content and "[Date]" not in content:  # Skip templates
-            contexts.append(f"### {file.name}\n{content}")
-
-    return "\n\n".join(contexts) if contexts else ""
+            chunks.extend(dict(c, kind="domain") for c in split_markdown_sections(content, file.name))
+    return chunks
+
+
+def build_knowledge_index() -> BM25Index:
+    """Build one BM25 index over all standards and domain-context sections."""
+    return BM25Index(load_standards_chunks() + load_domain_context_chunks())
+
+
+def get_knowledge_index() -> BM25Index:
+    """Return the shared knowledge index, rebuilding it only when a source file changed."""
+    sources = [d for d in (DIRS["STANDARDS"], DIRS["DOMAIN_CONTEXTS"]) if d.exists()]
+    signature = tuple((f, file_signature(f)) for d in sources for f in sorted(d.glob("*.md")))
+    with _CACHE_LOCK:
+        if _KNOWLEDGE_CACHE["signature"] != signature:
+            with tracing.span("build_knowledge_index") as sp:
+                _KNOWLEDGE_CACHE["index"] = build_knowledge_index()
+                sp.set(chunks=len(_KNOWLEDGE_CACHE["index"].chunks))
+            _KNOWLEDGE_CACHE["signature"] = signature
+        return _KNOWLEDGE_CACHE["index"]
+
+
+def ticket_query(ticket: dict) -> str:
+    """The text a ticket is matched against standards and domain contexts with."""
+    return " ".join([
+        ticket.get("title") or "",
+        ticket.get("type") or "",
+        (ticket.get("file") or "").replace("/", " ").replace(".", " "),
+        ticket.get("description") or "",
+    ])
+
+
+def retrieve_sections(knowledge: BM25Index, ticket: dict, kind: str, budget_tokens: int) -> str:
+    """Render the best-ranked sections of one kind for a ticket, within a token budget."""
+    sections = []
+    used = 0
+    for _, chunk in knowledge.search(ticket_query(ticket)):
+        if chunk["kind"] != kind:
+            continue
+        text = f"### {chunk['source']} - {chunk['heading']}\n{chunk['text']}"
+        tokens = estimate_tokens(text)
+        if used + tokens > budget_tokens:
+            continue
+        sections.append(text)
+        used += tokens
+    return "\n\n".join(sections)
 
 
-def build_ticket_context(ticket: dict) -> str:
+def build_ticket_context(ticket: dict, knowledge: BM25Index | None = None) -> str:
     """Build the full context for a ticket execution."""
+    if knowledge is None:
+        knowledge = get_knowledge_index()
     context_parts = []
 
     # Add schema if relevant
     if ticket.get("type") in ["Migration", "Model", "Database"]:
-        schema = read_file(FILES["SCHEMA"])
-        if schema:
-            context_parts.append(f"## Database Schema\n```sql\n{schema}\n```")
+        context_parts.append(shared_section("schema"))
 
     # Add API contract if relevant
     if ticket.get("type") in ["Controller", "API", "Endpoint", "Route"]:
-        api = read_file(FILES["API"])
-        if api:
-            context_parts.append(f"## API Contract\n```json\n{api}\n```")
+        context_parts.append(shared_section("api"))
 
     # Add infrastructure analysis
-    infra = read_file(FILES["INFRA"])
-    if infra:
-        context_parts.append(f"## Existing Infrastructure\n{infra}")
+    context_parts.append(shared_section("infra"))
 
-    # Add domain contexts (always include for business rules)
-    domain = load_domain_contexts()
+    # Add the domain-context sections relevant to this ticket
+    domain = retrieve_sections(knowledge, ticket, "domain", TICKET_DOMAIN_BUDGET)
     if domain:
         context_parts.append(f"## Domain Contexts (Business Rules & Code Navigation)\n{domain}")
 
-    # Add standards (always include)
-    standards = load_standards()
+    # Add the standards sections relevant to this ticket
+    standards = retrieve_sections(knowledge, ticket, "standards", TICKET_STANDARDS_BUDGET)
     if standards:
         context_parts.append(f"## Coding Standards\n{standards}")
 
-    return "\n\n---\n\n".join(context_parts)
+    return "\n\n---\n\n".join(part for part in context_parts if part)
 
 
 def build_prompt(ticket: dict, context: str) -> str:
@@ -281,39 +659,71 @@ Then output the complete file contents.
 # --- JOB MANAGEMENT ---
 
 def init_job(ticket: dict, agent: str) -> tuple[str, Path]:
-    """Initialize a job directory for a ticket."""
+    """Initialize a job directory for a ticket (the prompt is written by prepare_prompt)."""
     ts = time.strftime("%Y%m%d_%H%M%S")
     job_id = f"ticket{ticket['id']}_{ts}_{uuid.uuid4().hex[:6]}"
     job_dir = RUNS_DIR / job_id
     job_dir.mkdir(parents=True, exist_ok=True)
 
-    # Save the prompt
-    context = build_ticket_context(ticket)
-    prompt = build_prompt(ticket, context)
-    (job_dir / "prompt.txt").write_text(prompt, encoding="utf-8")
-
     # Save ticket info
     write_json(job_dir / "ticket.json", ticket)
 
-    # Initialize status
+    # Initialize status (the scheduler flips it to "running" on admission)
     status = {
         "job_id": job_id,
         "ticket_id": ticket["id"],
         "ticket_title": ticket["title"],
         "agent": agent,
-        "started_at": now_iso(),
-        "status": "running",
+        "queued_at": now_iso(),
+        "started_at": None,
+        "status": "queued",
         "exit_code": None,
         "duration_ms": 0,
     }
     write_json(job_dir / "status.json", status)
-    (job_dir / "output.jsonl").write_text('{"event":"start"}\n', encoding="utf-8")
-    (job_dir / "run.log").write_text(f"[{now_iso()}] Job {job_id} started\n", encoding="utf-8")
+    register_job(status)
+    (job_dir / "output.jsonl").write_text('{"event":"queued"}\n', encoding="utf-8")
+    (job_dir / "run.log").write_text(f"[{now_iso()}] Job {job_id} queued\n", encoding="utf-8")
 
     return job_id, job_dir
 
 
-def spawn_worker(job_id: str, agent: str, job_dir: Path):
+def prepare_prompt(ticket: dict, job_dir: Path):
+    """Assemble a ticket's prompt from the shared context and save it to prompt.txt."""
+    with tracing.span("prepare_prompt", ticket=ticket["id"]) as sp:
+        context = build_ticket_context(ticket)
+        prompt = build_prompt(ticket, context)
+        (job_dir / "prompt.txt").write_text(prompt, encoding="utf-8")
+        sp.set(prompt_bytes=len(prompt.encode("utf-8")))
+
+
+# Backends report the first byte from their reader threads - a hedged job
+# from two at once - so status.json read-modify-writes are serialized
+_STATUS_LOCK = threading.Lock()
+
+
+def update_job_status(job_dir: Path, **fields):
+    """Merge fields into a job's status.json and the job registry."""
+    status_path = job_dir / "status.json"
+    with _STATUS_LOCK:
+        status = load_json(status_path) or {}
+        status.update(fields)
+        write_json(status_path, status)
+        register_job(status)  # in the same order as status.json
+    return status
+
+
+def register_job(status: dict):
+    """Mirror a status transition into the registry (status.json stays authoritative)."""
+    try:
+        REGISTRY.record(status)
+    except sqlite3.Error as e:
+        print(f"⚠️  Job registry update failed for {status.get('job_id')}: {e} "
+              f"(run --rebuild-registry to resync)", file=sys.stderr)
+
+
+def spawn_worker(job_id: str, agent: str, job_dir: Path, cache_mode: str = "use",
+                 hedge: dict | None = None) -> subprocess.Popen:
     """Spawn a detached worker subprocess."""
     log_f = open(job_dir / "run.log", "a", encoding="utf-8")
     cmd = [
@@ -323,101 +733,321 @@ def spawn_worker(job_id: str, agent: str, job_dir: Path):
         "--job-id", job_id,
         "--agent", agent,
         "--job-dir", str(job_dir),
+        *({"off": ["--no-cache"], "use": ["--cache"]}.get(cache_mode, [])),
+        *(["--hedge", hedge["agent"], "--hedge-delay", str(hedge["delay"])] if hedge else []),
     ]
-    subprocess.Popen(
-        cmd,
-        stdout=log_f,
-        stderr=log_f,
-        stdin=subprocess.DEVNULL,
-        cwd=str(ROOT),
-        start_new_session=True,
-        close_fds=True,
-    )
+    try:
+        return subprocess.Popen(
+            cmd,
+            stdout=log_f,
+            stderr=log_f,
+            stdin=subprocess.DEVNULL,
+            cwd=str(ROOT),
+            env={**os.environ, **tracing.child_env()},
+            start_new_session=True,
+            close_fds=True,
+        )
+    finally:
+        log_f.close()
+
+
+async def stream_agent_output(backend, prompt: str, job_dir: Path, start: float,
+                              report_name: str = "report.md") -> tuple[int, str]:
+    """
+    Send prompt to the agent's backend and stream its output into
+    report_name as it arrives.
+
+    Each chunk is appended to the report and logged as a "chunk" event in
+    output.jsonl. Time-to-first-byte is written to status.json as soon as
+    the first chunk arrives; total output bytes when the call ends. A hedge
+    call (HEDGE_REPORT) records them as hedge_ttfb_ms, hedge_first_byte_at
+    and hedge_output_bytes, so it never overwrites the primary's. The
+    backend kills the agent if it runs past its timeout or the job is
+    cancelled.
+
+    Returns:
+        (returncode, stderr)
+    """
+    total_bytes = 0
+    ttfb_ms = None
+    prefix = "hedge_" if report_name == HEDGE_REPORT else ""
+
+    with open(job_dir / report_name, "wb") as report, \
+            open(job_dir / "output.jsonl", "a", encoding="utf-8") as events:
+
+        def on_chunk(chunk: bytes):
+            nonlocal total_bytes, ttfb_ms
+            elapsed_ms = int((time.time() - start) * 1000)
+            if ttfb_ms is None:
+                ttfb_ms = elapsed_ms
+                update_job_status(job_dir, **{f"{prefix}ttfb_ms": ttfb_ms, f"{prefix}first_byte_at": now_iso()})
+            report.write(chunk)
+            report.flush()
+            events.write(json.dumps({
+                "event": "chunk", "offset": total_bytes, "bytes": len(chunk), "elapsed_ms": elapsed_ms,
+                **({"report": report_name} if report_name != "report.md" else {}),
+            }) + "\n")
+            events.flush()
+            total_bytes += len(chunk)
+
+        try:
+            returncode, _, stderr = await backend.run_async(prompt, on_chunk=on_chunk)
+        finally:
+            update_job_status(job_dir, **{f"{prefix}output_bytes": total_bytes})
+
+    return returncode, stderr
+
+
+def classify_failure(returncode: int | None, stderr: str) -> str:
+    """Classify a failed agent call for the retry policy."""
+    if RATE_LIMIT_RE.search(stderr):
+        return "rate_limit"
+    if returncode is not None and returncode > 0 and HARD_FAILURE_RE.search(stderr):
+        return "hard"
+    return "transient"  # timeouts, crashes, network and server errors, unknown exit codes
+
+
+def retry_delay(policy: dict, kind: str, attempt: int) -> float:
+    """Exponential backoff with +/-50% jitter before retry number `attempt` (1-based)."""
+    base = policy["rate_limit_base_delay"] if kind == "rate_limit" else policy["base_delay"]
+    delay = min(policy["max_delay"], base * 2 ** (attempt - 1))
+    return delay * random.uniform(0.5, 1.5)
+
+
+async def call_agent_with_retries(agent: str, prompt: str, job_dir: Path, start: float,
+                                  report_name: str = "report.md"):
+    """
+    Run the agent on prompt, streaming into report_name, retrying
+    failures according to the agent's retry policy.
+
+    The attempt count and the duration of the successful agent call
+    (call_ms, used by hedge_delay) go into status.json, prefixed with
+    hedge_ for a hedge call like stream_agent_output's fields.
+
+    Raises:
+        AgentCallError: once the failure is hard or the attempts are used up.
+    """
+    backend = AGENT_BACKENDS.get(agent)
+    policy = {**RETRY_DEFAULTS, **backend.config.get("retry", {})}
+    prefix = "hedge_" if report_name == HEDGE_REPORT else ""
+    attempt = 0
+    while True:
+        attempt += 1
+        update_job_status(job_dir, **{f"{prefix}attempts": attempt})
+        call_start = time.time()
+        with tracing.span("agent_call", "agent", agent=agent, attempt=attempt,
+                          prompt_bytes=len(prompt.encode("utf-8"))) as sp:
+            try:
+                returncode, stderr = await stream_agent_output(backend, prompt, job_dir, start, report_name)
+                sp.set(returncode=returncode, response_bytes=(job_dir / report_name).stat().st_size)
+                if returncode == 0:
+                    update_job_status(job_dir, **{f"{prefix}call_ms": int((time.time() - call_start) * 1000)})
+                    return
+                error = AgentCallError(f"{agent} CLI failed: {stderr}", classify_failure(returncode, stderr))
+            except subprocess.TimeoutExpired as e:
+                error = AgentCallError(str(e), "transient")
+            except FileNotFoundError as e:
+                sp.set(error="hard")
+                raise AgentCallError(f"{agent} CLI not found: {e}", "hard") from None
+            except OSError as e:
+                error = AgentCallError(f"{agent} backend unreachable: {e}", "transient")
+            sp.set(error=error.kind)
+
+        max_attempts = policy["rate_limit_attempts"] if error.kind == "rate_limit" else policy["attempts"]
+        if error.kind == "hard" or attempt >= max_attempts:
+            raise error
+
+        delay = retry_delay(policy, error.kind, attempt)
+        with open(job_dir / "output.jsonl", "a", encoding="utf-8") as f:
+            f.write(json.dumps({"event": "retry", "attempt": attempt, "kind": error.kind,
+                                "delay_s": round(delay, 1), "message": str(error)[:500],
+                                **({"report": report_name} if report_name != "report.md" else {})}) + "\n")
+        with open(job_dir / "run.log", "a", encoding="utf-8") as lf:
+            lf.write(f"[{now_iso()}] {agent} attempt {attempt} failed ({error.kind}), retrying in {delay:.1f}s: "
+                     f"{str(error).strip()[:200]}\n")
+        await asyncio.sleep(delay)
 
 
-def run_worker(job_id: str, agent: str, job_dir: Path) -> int:
-    """Execute the agent call (run in worker subprocess)."""
+def finish_report(report_path: Path) -> str:
+    """Strip surrounding whitespace from a streamed report; returns its text."""
+    raw = report_path.read_text(encoding="utf-8", errors="replace")
+    text = raw.strip()
+    if text != raw:
+        report_path.write_text(text, encoding="utf-8")
+    return text
+
+
+def hedge_delay(agent: str, percentile: float = DEFAULT_HEDGE_PERCENTILE) -> float:
+    """
+    Seconds to wait for agent before hedging: the given percentile of its
+    recent successful call durations (call_ms, so retry backoff and rate-limit
+    waits are left out), or HEDGE_FALLBACK_DELAY without enough history.
+    """
+    durations = sorted(REGISTRY.durations(agent)) if RUNS_DIR.exists() else []
+    if len(durations) < HEDGE_MIN_SAMPLES:
+        return HEDGE_FALLBACK_DELAY
+    rank = max(0, min(len(durations) - 1, int(len(durations) * percentile / 100 + 0.5) - 1))
+    return durations[rank] / 1000
+
+
+async def call_agent_hedged(agent: str, hedge: dict, prompt: str, job_dir: Path, start: float) -> str:
+    """
+    Run the primary agent and, if it is still running after hedge["delay"]
+    seconds, the hedge agent on the same prompt. The first call to succeed
+    with a non-empty report wins; the other is cancelled, which kills its
+    process group. The winning output ends up in report.md.
+
+    Returns:
+        The name of the agent whose response was used.
+    """
+    hedge_agent = hedge["agent"]
+    reports = {agent: "report.md", hedge_agent: HEDGE_REPORT}
+    tasks = {asyncio.create_task(call_agent_with_retries(agent, prompt, job_dir, start)): agent}
+
+    done, _ = await asyncio.wait(tasks, timeout=hedge["delay"])
+    if not done:
+        update_job_status(job_dir, hedged_at=now_iso())
+        with open(job_dir / "output.jsonl", "a", encoding="utf-8") as f:
+            f.write(json.dumps({"event": "hedge", "agent": hedge_agent, "after_s": round(hedge["delay"], 1)}) + "\n")
+        hedge_task = call_agent_with_retries(hedge_agent, prompt, job_dir, start, HEDGE_REPORT)
+        tasks[asyncio.create_task(hedge_task)] = hedge_agent
+
+    pending = set(tasks)
+    errors = {}
+    try:
+        while pending:
+            done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                name = tasks[task]
+                if task.exception() is not None:
+                    error = task.exception()
+                elif (job_dir / reports[name]).stat().st_size == 0:
+                    error = AgentCallError(f"{name} CLI returned no output", "transient")
+                else:
+                    if name == hedge_agent:
+                        os.replace(job_dir / HEDGE_REPORT, job_dir / "report.md")
+                    return name
+                errors[name] = error
+                if name == hedge_agent:
+                    # run_job's error/failure fields describe the primary call
+                    update_job_status(job_dir, hedge_error=str(error),
+                                      **({"hedge_failure": error.kind} if isinstance(error, AgentCallError) else {}))
+    finally:
+        for task in pending:
+            task.cancel()
+        await asyncio.gather(*pending, return_exceptions=True)
+        (job_dir / HEDGE_REPORT).unlink(missing_ok=True)
+
+    raise errors.get(agent) or next(iter(errors.values()))
+
+
+async def run_job(job_id: str, agent: str, job_dir: Path, cache: LLMCache, hedge: dict | None = None) -> int:
+    """
+    Execute one job: serve it from the cache or run the agent CLI on its prompt.
+
+    Runs inside the supervisor's event loop (asyncio runner) or on its own
+    in a detached worker process (run_worker). With hedge ({"agent",
+    "delay"}), a slow call is hedged on a second agent (call_agent_hedged).
+    Records the outcome in status.json and returns the exit code.
+    """
     start = time.time()
-    status_path = job_dir / "status.json"
     output_path = job_dir / "output.jsonl"
     report_path = job_dir / "report.md"
     prompt = (job_dir / "prompt.txt").read_text(encoding="utf-8")
+    job_span = tracing.begin("job", "agent", job=job_id, agent=agent)
 
     exit_code = 0
     err_msg = None
+    err_kind = None
+    cache_state = "off" if cache.mode == "off" else "miss"
 
-    try:
-        agent_config = AGENTS.get(agent.lower())
-        if not agent_config:
-            raise ValueError(f"Unsupported agent: {agent}. Supported: {list(AGENTS.keys())}")
-
-        # Build command with prompt
-        cmd = [c.replace("{prompt}", prompt) if "{prompt}" in c else c for c in agent_config["cmd"]]
-
-        result = subprocess.run(
-            cmd,
-            capture_output=True,
-            text=True,
-            timeout=agent_config["timeout"],
-            cwd=str(ROOT),
-        )
-
-        if result.returncode != 0:
-            raise Exception(f"{agent} CLI failed: {result.stderr}")
+    with open(output_path, "a", encoding="utf-8") as f:
+        f.write(json.dumps({"event": "start"}) + "\n")
 
-        # Save output
-        text = result.stdout.strip()
-        report_path.write_text(text, encoding="utf-8")
+    try:
+        key = cache_key(agent, AGENT_BACKENDS.get(agent).identity, prompt)
+        text = await asyncio.to_thread(cache.get, key)
+        if text is not None:
+            cache_state = "hit"
+            # Save output
+            report_path.write_text(text, encoding="utf-8")
+        elif hedge:
+            answered_by = await call_agent_hedged(agent, hedge, prompt, job_dir, start)
+            update_job_status(job_dir, answered_by=answered_by, output_bytes=report_path.stat().st_size)
+            text = finish_report(report_path)
+            # Cache under the agent that actually answered, and under the primary's
+            # key so the next run finds a hedge win without paying for the slow call
+            answered_key = cache_key(answered_by, AGENT_BACKENDS.get(answered_by).identity, prompt)
+            await asyncio.to_thread(cache.put, answered_key, text, answered_by)
+            if answered_key != key:
+                await asyncio.to_thread(cache.put, key, text, answered_by)
+        else:
+            await call_agent_with_retries(agent, prompt, job_dir, start)
+            text = finish_report(report_path)
+            await asyncio.to_thread(cache.put, key, text, agent)
 
         with open(output_path, "a", encoding="utf-8") as f:
             f.write(json.dumps({"event": "final", "report": "report.md"}) + "\n")
 
+    except asyncio.CancelledError:
+        update_job_status(job_dir, status="cancelled", finished_at=now_iso(),
+                          duration_ms=int((time.time() - start) * 1000))
+        tracing.end(job_span, error="cancelled")
+        raise
     except Exception as e:
         exit_code = 1
         err_msg = str(e)
+        err_kind = e.kind if isinstance(e, AgentCallError) else None
         with open(output_path, "a", encoding="utf-8") as f:
-            f.write(json.dumps({"event": "error", "message": err_msg}) + "\n")
+            f.write(json.dumps({"event": "error", "message": err_msg,
+                                **({"kind": err_kind} if err_kind else {})}) + "\n")
         with open(job_dir / "run.log", "a", encoding="utf-8") as lf:
             lf.write(f"[{now_iso()}] ERROR: {e}\n")
 
     # Update status
-    duration_ms = int((time.time() - start) * 1000)
-    status = load_json(status_path)
-    status.update({
-        "status": "completed" if exit_code == 0 else "failed",
-        "exit_code": exit_code,
-        "duration_ms": duration_ms,
-        "finished_at": now_iso(),
+    update_job_status(
+        job_dir,
+        status="completed" if exit_code == 0 else "failed",
+        exit_code=exit_code,
+        duration_ms=int((time.time() - start) * 1000),
+        finished_at=now_iso(),
+        cache=cache_state,
         **({"error": err_msg} if err_msg else {}),
-    })
-    write_json(status_path, status)
+        **({"failure": err_kind} if err_kind else {}),
+    )
+    tracing.end(job_span, cache=cache_state, response_bytes=len(text.encode("utf-8")) if exit_code == 0 else 0,
+                **({"error": err_kind or "failed"} if exit_code else {}))
 
     return exit_code
 
 
+def run_worker(job_id: str, agent: str, job_dir: Path, cache_mode: str = "use", hedge: dict | None = None) -> int:
+    """Execute the agent call (run in a detached worker subprocess)."""
+    return asyncio.run(run_job(job_id, agent, job_dir, LLMCache(CACHE_DIR, cache_mode), hedge))
+
 
 # --- EXECUTION STATUS ---
 
-def get_execution_status() -> dict:
-    """Get status of all jobs."""
+def ensure_registry():
+    """Index job directories and archives written before the registry existed."""
+    if REGISTRY.is_empty() and (any(RUNS_DIR.glob("*/status.json")) or any(ARCHIVE_DIR.glob("*.zip"))):
+        REGISTRY.rebuild(RUNS_DIR, ARCHIVE_DIR)
+
+
+def get_execution_status(limit: int = 10) -> dict:
+    """Get the job summary and the last `limit` jobs from the registry."""
     if not RUNS_DIR.exists():
-        return {"jobs": [], "summary": {"total": 0, "running": 0, "completed": 0, "failed": 0}}
-
-    jobs = []
-    for job_dir in sorted(RUNS_DIR.iterdir()):
-        if job_dir.is_dir():
-            status_file = job_dir / "status.json"
-            if status_file.exists():
-                jobs.append(load_json(status_file))
-
-    summary = {
-        "total": len(jobs),
-        "running": sum(1 for j in jobs if j.get("status") == "running"),
-        "completed": sum(1 for j in jobs if j.get("status") == "completed"),
-        "failed": sum(1 for j in jobs if j.get("status") == "failed"),
-    }
+        return {"jobs": [], "summary": {"total": 0, "queued": 0, "running": 0, "completed": 0, "failed": 0,
+                                        "blocked": 0}}
+
+    ensure_registry()
+    summary = {"total": 0, "queued": 0, "running": 0, "completed": 0, "failed": 0, "blocked": 0}
+    summary.update(REGISTRY.summary())
 
-    return {"jobs": jobs, "summary": summary}
+    return {"jobs": REGISTRY.recent(limit), "summary": summary}
+
+
+JOB_ICONS = {"completed": "✅", "running": "🔄", "queued": "⏳", "blocked": "⛔", "cancelled": "🚫"}
 
 
 def print_status():
@@ -432,51 +1062,413 @@ def print_status():
     print(f"\nTotal Jobs: {s['total']}")
     print(f"  ✅ Completed: {s['completed']}")
     print(f"  🔄 Running: {s['running']}")
+    print(f"  ⏳ Queued: {s['queued']}")
     print(f"  ❌ Failed: {s['failed']}")
+    print(f"  ⛔ Blocked: {s['blocked']}")
+    if s.get("cancelled"):
+        print(f"  🚫 Cancelled: {s['cancelled']}")
 
     if status["jobs"]:
         print("\n" + "-" * 60)
         print("Recent Jobs:")
         print("-" * 60)
-        for job in status["jobs"][-10:]:  # Last 10 jobs
-            icon = "✅" if job["status"] == "completed" else "🔄" if job["status"] == "running" else "❌"
-            print(f"  {icon} {job['job_id']}: Ticket {job.get('ticket_id', '?')} - {job['status']}")
+        for job in status["jobs"]:
+            print_job_line(job)
+
+
+def print_job_line(job: dict):
+    icon = JOB_ICONS.get(job["status"], "❌")
+    timing = f" (first byte {job['ttfb_ms']} ms)" if job.get("ttfb_ms") is not None else ""
+    archived = f" [archived: {job['archive']}]" if job.get("archive") else ""
+    print(f"  {icon} {job['job_id']}: Ticket {job.get('ticket_id', '?')} - {job['status']}{timing}{archived}")
+
+
+def print_ticket_history(ticket_id: int):
+    """Print every job run for one ticket."""
+    ensure_registry()
+    history = REGISTRY.ticket_history(ticket_id) if RUNS_DIR.exists() else []
+
+    print("\n" + "=" * 60)
+    print(f"📜 TICKET {ticket_id} HISTORY ({len(history)} run(s))")
+    print("=" * 60)
+    for job in history:
+        print_job_line(job)
+        if job.get("error"):
+            print(f"       {job['error'].strip()[:200]}")
+
+
+# --- RETENTION ---
+
+def read_job_file(job_id: str, name: str) -> str | None:
+    """Read a file of a job, from its directory or, once compacted, its day archive."""
+    path = RUNS_DIR / job_id / name
+    if path.exists():
+        return path.read_text(encoding="utf-8")
+    job = REGISTRY.get(job_id) if RUNS_DIR.exists() else None
+    if not job or not job.get("archive"):
+        return None
+    try:
+        with zipfile.ZipFile(ARCHIVE_DIR / job["archive"]) as zf:
+            return zf.read(f"{job_id}/{name}").decode("utf-8")
+    except (OSError, KeyError, zipfile.BadZipFile):
+        return None
+
+
+def archive_day(job: dict) -> str:
+    """The archive a job is packed into: one per UTC day it was queued."""
+    return f"{(job.get('queued_at') or '')[:10] or 'undated'}.zip"
+
+
+def compact_runs(keep_days: float = DEFAULT_KEEP_DAYS, keep_last: int = DEFAULT_KEEP_LAST,
+                 archive_days: float = DEFAULT_ARCHIVE_DAYS):
+    """
+    Pack old finished jobs into per-day zip archives and delete expired archives.
+
+    Queued and running jobs are never touched. Archived jobs stay in the
+    registry, so --status, --status --ticket and --report still find them.
+    """
+    if not RUNS_DIR.exists():
+        print("Nothing to compact: no jobs yet")
+        return
+    ensure_registry()
+
+    cutoff = (datetime.utcnow() - timedelta(days=keep_days)).isoformat() + "Z"
+    finished = REGISTRY.unarchived(FINISHED_STATES)  # newest first
+    candidates = [job for rank, job in enumerate(finished)
+                  if (rank >= keep_last or (job.get("queued_at") or "") < cutoff)
+                  and (RUNS_DIR / job["job_id"]).is_dir()]
+
+    by_archive = {}
+    for job in candidates:
+        by_archive.setdefault(archive_day(job), []).append(job["job_id"])
+
+    ARCHIVE_DIR.mkdir(parents=True, exist_ok=True)
+    for archive, job_ids in sorted(by_archive.items()):
+        with zipfile.ZipFile(ARCHIVE_DIR / archive, "a", compression=zipfile.ZIP_DEFLATED) as zf:
+            present = set(zf.namelist())
+            for job_id in job_ids:
+                for path in sorted((RUNS_DIR / job_id).iterdir()):
+                    member = f"{job_id}/{path.name}"
+                    if path.is_file() and member not in present:  # skip files left by an interrupted compaction
+                        zf.write(path, member)
+        REGISTRY.mark_archived(job_ids, archive)
+        for job_id in job_ids:
+            shutil.rmtree(RUNS_DIR / job_id)
+        print(f"  🗜️  {archive}: {len(job_ids)} job(s) archived")
+
+    # Expire whole day archives
+    expired_before = (datetime.utcnow() - timedelta(days=archive_days)).strftime("%Y-%m-%d")
+    purged = 0
+    for archive in sorted(ARCHIVE_DIR.glob("*.zip")):
+        if archive.stem < expired_before:
+            purged += REGISTRY.forget_archive(archive.name)
+            archive.unlink()
+            print(f"  🗑️  {archive.name}: expired")
+
+    print(f"\n✅ Compacted {len(candidates)} job(s) into {len(by_archive)} archive(s); "
+          f"{len(finished) - len(candidates)} finished job(s) kept; {purged} expired job(s) removed")
 
 
 # --- MAIN EXECUTION ---
 
-def execute_tickets(tickets: list[dict], agent: str, specific_ticket: int | None = None):
-    """Execute tickets by spawning sub-agents."""
+RETRYABLE_STATES = ("failed", "blocked", "cancelled")
+
+
+def failed_ticket_ids() -> tuple[set[int], dict]:
+    """
+    Tickets of the latest execution (06-execution-status.json) that did not
+    complete: failed ones, and the ones blocked or cancelled because of them.
+
+    Returns:
+        (ticket ids, the latest execution status)
+    """
+    execution_status = load_json(FILES["EXECUTION_STATUS"]) or {}
+    ticket_ids = set()
+    for job_id in execution_status.get("job_ids", []):
+        raw = read_job_file(job_id, "status.json")
+        status = json.loads(raw) if raw else {}
+        if status.get("status") in RETRYABLE_STATES and status.get("ticket_id") is not None:
+            ticket_ids.add(status["ticket_id"])
+    return ticket_ids, execution_status
+
+
+def execute_tickets(tickets: list[dict], agent: str, specific_ticket: int | None = None,
+                    max_parallel: int = DEFAULT_MAX_PARALLEL, cache_mode: str = "use",
+                    runner: str = DEFAULT_RUNNER, retry_of: str | None = None,
+                    hedge_agent: str | None = None, hedge_percentile: float = DEFAULT_HEDGE_PERCENTILE):
+    """Execute tickets through a bounded pool of sub-agents (see RUNNERS)."""
     if specific_ticket:
         tickets = [t for t in tickets if t["id"] == specific_ticket]
         if not tickets:
             print(f"❌ Ticket {specific_ticket} not found in plan")
             return
 
-    print(f"\n🚀 Executing {len(tickets)} ticket(s) with {agent}...")
-
-    job_ids = []
-    for ticket in tickets:
-        print(f"\n  📋 Ticket {ticket['id']}: {ticket['title']}")
-        job_id, job_dir = init_job(ticket, agent)
-        spawn_worker(job_id, agent, job_dir)
-        print(f"     → Spawned job: {job_id}")
-        job_ids.append(job_id)
+    max_parallel = max(1, max_parallel)
+    try:
+        tickets = topological_order(tickets)
+    except ValueError as e:
+        print(f"❌ {e}")
+        print("   Fix the ticket headings or **Depends on:** lines in the Implementation Plan")
+        return
+    print(f"\n🚀 Executing {len(tickets)} ticket(s) with {agent} "
+          f"(max {max_parallel} in parallel, {runner} runner)...")
+
+    hedge = None
+    if hedge_agent:
+        hedge = {"agent": hedge_agent, "delay": hedge_delay(agent, hedge_percentile)}
+        print(f"   🪁 Hedging on {hedge_agent} after {hedge['delay']:.1f}s "
+              f"(p{hedge_percentile:g} of past {agent} calls, or the default without enough history)")
+
+    # Queue every ticket up front so status.json shows the full backlog
+    pending = []
+    with tracing.span("init_jobs", jobs=len(tickets)):
+        for ticket in tickets:
+            job_id, job_dir = init_job(ticket, agent)
+            pending.append((ticket, job_id, job_dir))
+    job_ids = [job_id for _, job_id, _ in pending]
 
-    # Save execution status
     execution_status = {
         "started_at": now_iso(),
         "agent": agent,
+        "max_parallel": max_parallel,
+        "runner": runner,
+        **({"retry_of": retry_of} if retry_of else {}),
+        **({"hedge": hedge} if hedge else {}),
         "tickets_spawned": len(job_ids),
         "job_ids": job_ids,
     }
     write_json(FILES["EXECUTION_STATUS"], execution_status)
 
-    print(f"\n✅ Spawned {len(job_ids)} sub-agent job(s)")
+    # Assemble prompts in the background, in dependency order, so the first
+    # workers start as soon as their own prompts are ready
+    with ThreadPoolExecutor(max_workers=PROMPT_BUILDERS) as builders, \
+            tracing.span("schedule", runner=runner, max_parallel=max_parallel):
+        build_prompt_traced = tracing.bind(prepare_prompt)
+        prompts = {job_id: builders.submit(build_prompt_traced, ticket, job_dir) for ticket, job_id, job_dir in pending}
+        try:
+            if runner == "asyncio":
+                results = asyncio.run(run_supervisor(pending, agent, max_parallel, cache_mode, prompts, hedge))
+            else:
+                results = run_scheduler(pending, agent, max_parallel, cache_mode, prompts, hedge)
+        except BaseException:
+            for future in prompts.values():
+                future.cancel()
+            raise
+    final_statuses = [load_json(job_dir / "status.json") or {} for _, _, job_dir in pending]
+    cache_states = [status.get("cache") for status in final_statuses]
+
+    execution_status.update({
+        "finished_at": now_iso(),
+        "completed": sum(1 for r in results.values() if r == "completed"),
+        "failed": sum(1 for r in results.values() if r == "failed"),
+        "blocked": sum(1 for r in results.values() if r == "blocked"),
+        "cache_hits": cache_states.count("hit"),
+        "cache_misses": cache_states.count("miss"),
+        **({"hedged": sum(1 for status in final_statuses if status.get("hedged_at")),
+            "hedge_wins": sum(1 for status in final_statuses if status.get("answered_by") == hedge_agent)}
+           if hedge else {}),
+    })
+    write_json(FILES["EXECUTION_STATUS"], execution_status)
+
+    print(f"\n✅ Finished {len(job_ids)} sub-agent job(s): "
+          f"{execution_status['completed']} completed, {execution_status['failed']} failed, "
+          f"{execution_status['blocked']} blocked")
+    if cache_mode != "off":
+        print(f"   💾 LLM cache: {execution_status['cache_hits']} hit(s), "
+              f"{execution_status['cache_misses']} miss(es)")
+    if hedge:
+        print(f"   🪁 Hedged {execution_status['hedged']} job(s); {hedge_agent} answered first "
+              f"{execution_status['hedge_wins']} time(s)")
     print(f"   Check status with: python scripts/executor.py --status")
     print(f"   Job outputs in: {RUNS_DIR}/")
 
 
+def block_failed_dependents(queue: list, ticket_status: dict, results: dict):
+    """Mark queued jobs whose prerequisites failed as "blocked" (repeats so blocks propagate)."""
+    blocked_any = True
+    while blocked_any:
+        blocked_any = False
+        for entry in list(queue):
+            ticket, job_id, job_dir = entry
+            failed = [d for d in ticket["depends_on"]
+                      if ticket_status.get(d) not in (None, "completed")]
+            if failed:
+                queue.remove(entry)
+                update_job_status(job_dir, status="blocked", finished_at=now_iso(),
+                                  error=f"Prerequisite ticket(s) {failed} did not complete")
+                results[job_id] = ticket_status[ticket["id"]] = "blocked"
+                blocked_any = True
+                print(f"     ⛔ {job_id}: blocked by ticket(s) {failed}")
+
+
+def take_ready_jobs(queue: list, free_slots: int, scheduled: set, ticket_status: dict,
+                    results: dict, prompts: dict[str, Future]) -> list[tuple[dict, str, Path]]:
+    """
+    Remove up to free_slots ready jobs from the queue, in dependency order.
+
+    A job is ready once its prompt has been written and every prerequisite
+    ticket in this run has completed. Jobs whose prompt assembly raised are
+    marked "failed" and dropped from the queue.
+    """
+    ready = []
+    for entry in list(queue):
+        if len(ready) >= free_slots:
+            break
+        ticket, job_id, job_dir = entry
+        if any(d in scheduled and ticket_status.get(d) != "completed" for d in ticket["depends_on"]):
+            continue
+        prompt_future = prompts.get(job_id)
+        if prompt_future is not None:
+            if not prompt_future.done():
+                continue
+            if prompt_future.exception() is not None:
+                queue.remove(entry)
+                update_job_status(job_dir, status="failed", finished_at=now_iso(),
+                                  error=f"Prompt assembly failed: {prompt_future.exception()}")
+                results[job_id] = ticket_status[ticket["id"]] = "failed"
+                print(f"     ❌ {job_id}: prompt assembly failed: {prompt_future.exception()}")
+                continue
+        queue.remove(entry)
+        update_job_status(job_dir, status="running", started_at=now_iso())
+        ready.append(entry)
+    return ready
+
+
+def run_scheduler(pending: list[tuple[dict, str, Path]], agent: str, max_parallel: int,
+                  cache_mode: str = "use", prompts: dict[str, Future] | None = None,
+                  hedge: dict | None = None) -> dict:
+    """
+    Admit queued jobs into at most max_parallel detached worker processes.
+
+    A job becomes ready once its prompt has been written (when prompts maps
+    job_id -> prompt-assembly future) and every prerequisite ticket in this
+    run has completed. Prerequisites outside the run (e.g. with --ticket) count as
+    satisfied; if a prerequisite fails, its dependents are marked "blocked".
+
+    Returns a mapping of job_id -> final status.
+    """
+    queue = list(pending)
+    prompts = prompts or {}
+    running = {}  # job_id -> (process, job_dir, ticket id)
+    results = {}
+    scheduled = {ticket["id"] for ticket, _, _ in pending}
+    ticket_status = {}  # ticket id -> final status
+
+    try:
+        while queue or running:
+            block_failed_dependents(queue, ticket_status, results)
+
+            # Fill free slots with ready tickets, in dependency order
+            ready = take_ready_jobs(queue, max_parallel - len(running), scheduled, ticket_status, results, prompts)
+            for ticket, job_id, job_dir in ready:
+                running[job_id] = (spawn_worker(job_id, agent, job_dir, cache_mode, hedge), job_dir, ticket["id"])
+                print(f"  📋 Ticket {ticket['id']}: {ticket['title']}")
+                print(f"     → Spawned job: {job_id} ({len(running)}/{max_parallel} slots, {len(queue)} queued)")
+
+            if not running:
+                preparing = [f for f in prompts.values() if not f.done()]
+                if preparing:
+                    wait(preparing, timeout=POLL_INTERVAL, return_when=FIRST_COMPLETED)
+                elif queue:
+                    # Unreachable for an acyclic plan, but never spin forever
+                    raise RuntimeError(f"No runnable tickets left among {[t['id'] for t, _, _ in queue]}")
+                continue
+
+            time.sleep(POLL_INTERVAL)
+
+            for job_id, (proc, job_dir, ticket_id) in list(running.items()):
+                returncode = proc.poll()
+                if returncode is None:
+                    continue
+                del running[job_id]
+                status = load_json(job_dir / "status.json") or {}
+                if status.get("status") not in ("completed", "failed"):
+                    # Worker died before recording its result
+                    status = update_job_status(
+                        job_dir,
+                        status="failed",
+                        exit_code=returncode,
+                        finished_at=now_iso(),
+                        error=f"Worker exited with code {returncode} without reporting",
+                    )
+                results[job_id] = ticket_status[ticket_id] = status["status"]
+                icon = "✅" if status["status"] == "completed" else "❌"
+                print(f"     {icon} {job_id}: {status['status']}")
+    except KeyboardInterrupt:
+        # Running workers are detached and keep going; never start the rest
+        for _, job_id, job_dir in queue:
+            update_job_status(job_dir, status="cancelled", finished_at=now_iso())
+        print(f"\n⚠️  Interrupted: {len(queue)} queued job(s) cancelled, {len(running)} still running")
+        raise
+
+    return results
+
+
+async def run_supervisor(pending: list[tuple[dict, str, Path]], agent: str, max_parallel: int,
+                         cache_mode: str = "use", prompts: dict[str, Future] | None = None,
+                         hedge: dict | None = None) -> dict:
+    """
+    Run queued jobs in this process, at most max_parallel at a time.
+
+    Same admission rules as run_scheduler, but each job is an asyncio task
+    that runs the agent CLI directly (no worker interpreter per ticket), so
+    one event loop can supervise hundreds of agents. Unlike detached
+    workers, running agents are killed if the supervisor is interrupted.
+
+    Returns a mapping of job_id -> final status.
+    """
+    queue = list(pending)
+    prompts = prompts or {}
+    running = {}  # task -> (job_id, job_dir, ticket id)
+    results = {}
+    scheduled = {ticket["id"] for ticket, _, _ in pending}
+    ticket_status = {}  # ticket id -> final status
+    cache = LLMCache(CACHE_DIR, cache_mode)
+
+    try:
+        while queue or running:
+            block_failed_dependents(queue, ticket_status, results)
+
+            ready = take_ready_jobs(queue, max_parallel - len(running), scheduled, ticket_status, results, prompts)
+            for ticket, job_id, job_dir in ready:
+                task = asyncio.create_task(run_job(job_id, agent, job_dir, cache, hedge))
+                running[task] = (job_id, job_dir, ticket["id"])
+                print(f"  📋 Ticket {ticket['id']}: {ticket['title']}")
+                print(f"     → Started job: {job_id} ({len(running)}/{max_parallel} slots, {len(queue)} queued)")
+
+            if not running:
+                if any(not f.done() for f in prompts.values()):
+                    await asyncio.sleep(POLL_INTERVAL)
+                elif queue:
+                    # Unreachable for an acyclic plan, but never spin forever
+                    raise RuntimeError(f"No runnable tickets left among {[t['id'] for t, _, _ in queue]}")
+                continue
+
+            # Wake on the first finished job, or periodically to admit jobs whose prompts are ready
+            done, _ = await asyncio.wait(running, timeout=POLL_INTERVAL, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                job_id, job_dir, ticket_id = running.pop(task)
+                if task.exception() is not None:
+                    status = update_job_status(job_dir, status="failed", finished_at=now_iso(),
+                                               error=f"Supervisor error: {task.exception()}")
+                else:
+                    status = load_json(job_dir / "status.json") or {}
+                results[job_id] = ticket_status[ticket_id] = status["status"]
+                icon = "✅" if status["status"] == "completed" else "❌"
+                print(f"     {icon} {job_id}: {status['status']}")
+    except (KeyboardInterrupt, asyncio.CancelledError):
+        # Agents run inside this process: stop them along with the queue
+        for task in running:
+            task.cancel()
+        await asyncio.gather(*running, return_exceptions=True)
+        for _, job_id, job_dir in queue:
+            update_job_status(job_dir, status="cancelled", finished_at=now_iso())
+        print(f"\n⚠️  Interrupted: {len(queue)} queued and {len(running)} running job(s) cancelled")
+        raise
+
+    return results
+
+
 def main():
     parser = argparse.ArgumentParser(
         description="Zero Ambiguity Executor - State 4: Execute Implementation Plan"
@@ -486,20 +1478,87 @@ def main():
     parser.add_argument("--job-dir", default=None, help=argparse.SUPPRESS)
     parser.add_argument("--agent", default=DEFAULT_AGENT, help=f"Agent to use (default: {DEFAULT_AGENT})")
     parser.add_argument("--ticket", type=int, default=None, help="Execute specific ticket number")
-    parser.add_argument("--status", action="store_true", help="Show execution status")
+    parser.add_argument("--status", action="store_true",
+                        help="Show execution status (with --ticket: that ticket's run history)")
+    parser.add_argument("--rebuild-registry", action="store_true",
+                        help="Rebuild the job registry from the job directories and archives")
+    parser.add_argument("--report", metavar="JOB_ID", default=None,
+                        help="Print a job's report (also for archived jobs)")
+    parser.add_argument("--compact", action="store_true",
+                        help="Pack old finished jobs into per-day archives")
+    parser.add_argument("--keep-days", type=float, default=DEFAULT_KEEP_DAYS,
+                        help=f"--compact: keep finished jobs younger than this (default: {DEFAULT_KEEP_DAYS})")
+    parser.add_argument("--keep-last", type=int, default=DEFAULT_KEEP_LAST,
+                        help=f"--compact: keep at most this many finished jobs (default: {DEFAULT_KEEP_LAST})")
+    parser.add_argument("--archive-days", type=float, default=DEFAULT_ARCHIVE_DAYS,
+                        help=f"--compact: delete archives older than this (default: {DEFAULT_ARCHIVE_DAYS})")
     parser.add_argument("--list", action="store_true", help="List tickets without executing")
+    parser.add_argument("--retry-failed", action="store_true",
+                        help="Re-run only the tickets that did not complete in the latest execution")
+    parser.add_argument("--max-parallel", type=int, default=DEFAULT_MAX_PARALLEL,
+                        help=f"Maximum concurrent sub-agents (default: {DEFAULT_MAX_PARALLEL})")
+    parser.add_argument("--hedge", metavar="AGENT", default=None,
+                        help="Also send slow prompts to this agent; the first valid answer wins")
+    parser.add_argument("--hedge-percentile", type=float, default=DEFAULT_HEDGE_PERCENTILE,
+                        help=f"Hedge once a call outlasts this percentile of past durations "
+                             f"(default: {DEFAULT_HEDGE_PERCENTILE})")
+    parser.add_argument("--hedge-delay", type=float, default=None, help=argparse.SUPPRESS)
+    parser.add_argument("--runner", choices=RUNNERS, default=DEFAULT_RUNNER,
+                        help=f"Run agents in-process (asyncio) or as detached workers (default: {DEFAULT_RUNNER})")
+    parser.add_argument("--cache", action="store_true",
+                        help="Serve cached agent responses instead of running the agent; the cached "
+                             "ticket is marked completed without its edits being re-applied")
+    parser.add_argument("--no-cache", action="store_true", help="Bypass the agent response cache")
+    parser.add_argument("--refresh", action="store_true",
+                        help="Ignore cached agent responses but store fresh ones (the default)")
+    parser.add_argument("--profile", action="store_true",
+                        help="Record a timing trace and print a profile summary at exit")
     args = parser.parse_args()
+    # Sub-agents run unattended with -y and edit files, so a cache hit would mark a
+    # ticket completed without touching the working tree: serve only with --cache
+    cache_mode = mode_from_flags(args.no_cache, args.refresh or not args.cache)
 
     # Worker mode (called by spawn_worker)
     if args.worker:
+        tracing.enable_from_env()
         if not args.job_id or not args.job_dir or not args.agent:
             print("Missing worker args", file=sys.stderr)
             sys.exit(2)
-        sys.exit(run_worker(args.job_id, args.agent, Path(args.job_dir)))
+        hedge = {"agent": args.hedge, "delay": args.hedge_delay} if args.hedge else None
+        sys.exit(run_worker(args.job_id, args.agent, Path(args.job_dir), cache_mode, hedge))
+
+    if args.rebuild_registry:
+        count = REGISTRY.rebuild(RUNS_DIR, ARCHIVE_DIR)
+        print(f"🗂️  Rebuilt job registry from {count} job(s) in {RUNS_DIR}/")
+        if not args.status:
+            return
+
+    if args.profile:
+        trace_path = tracing.start("executor", str(ROOT / "context-engine" / ".cache" / "traces"), agent=args.agent)
+        print(f"⏱️  Tracing to {trace_path}")
+
+    if args.compact:
+        compact_runs(args.keep_days, args.keep_last, args.archive_days)
+        return
+
+    if args.report:
+        report = read_job_file(args.report, "report.md")
+        if report is None:
+            print(f"❌ No report found for job {args.report}")
+            sys.exit(1)
+        print(report)
+        return
+
+    if args.hedge and (args.hedge not in AGENT_BACKENDS or args.hedge.lower() == args.agent.lower()):
+        print(f"❌ --hedge must name a different agent from {AGENT_BACKENDS.names()}")
+        sys.exit(2)
 
     # Status mode
     if args.status:
-        print_status()
+        if args.ticket is not None:
+            print_ticket_history(args.ticket)
+        else:
+            print_status()
         return
 
     # Check for implementation plan
@@ -510,7 +1569,14 @@ def main():
         sys.exit(1)
 
     # Parse tickets
-    tickets = parse_tickets(plan_content)
+    with tracing.span("parse_plan") as sp:
+        try:
+            tickets = load_tickets(plan_content)
+        except ValueError as e:
+            print(f"❌ {e}")
+            print("   Give every ticket heading its own number")
+            sys.exit(1)
+        sp.set(tickets=len(tickets))
     if not tickets:
         print("❌ No tickets found in Implementation Plan")
         print("   Ensure tickets follow the format: ## Ticket N: Title")
@@ -522,11 +1588,24 @@ def main():
     if args.list:
         print("\nTickets:")
         for t in tickets:
-            print(f"  {t['id']}. [{t['priority']}] {t['title']} ({t['type']})")
+            deps = ", ".join(str(d) for d in t["depends_on"]) or "none"
+            print(f"  {t['id']}. [{t['priority']}] {t['title']} ({t['type']}) ← depends on: {deps}")
         return
 
+    retry_of = None
+    if args.retry_failed:
+        retry_ids, last_execution = failed_ticket_ids()
+        if not retry_ids:
+            print("✅ Nothing to retry: every ticket of the latest execution completed")
+            return
+        tickets = [t for t in tickets if t["id"] in retry_ids]
+        retry_of = last_execution.get("started_at")
+        print(f"🔁 Retrying {len(tickets)} ticket(s) from the execution started {retry_of}: "
+              f"{', '.join(str(t['id']) for t in tickets)}")
+
     # Execute
-    execute_tickets(tickets, args.agent, args.ticket)
+    execute_tickets(tickets, args.agent, args.ticket, args.max_parallel, cache_mode, args.runner, retry_of,
+                    args.hedge and args.hedge.lower(), args.hedge_percentile)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,170 @@
+#!/usr/bin/env python3
+"""
+Zero Ambiguity Fake Agent CLI
+
+Offline stand-in for the gemini/auggie CLIs, used by benchmark.py. Reads
+the prompt from stdin (or the -p argument), waits, then streams a
+synthetic response to stdout. Can also run as a long-lived server for the
+pool and http backends in agent_backends.py. Behaviour is set through environment
+variables:
+
+    ZA_FAKE_LATENCY        Mean seconds per call (default: 0.05)
+    ZA_FAKE_JITTER         Relative +/- spread of the latency (default: 0.5)
+    ZA_FAKE_TTFB           Fraction of the latency before the first byte (default: 0.5)
+    ZA_FAKE_OUTPUT_BYTES   Response size (default: 2000)
+    ZA_FAKE_ENDPOINTS      Endpoints in answers to "Output ONLY valid JSON" prompts,
+                           which get a JSON endpoint list instead of markdown (default: 8)
+    ZA_FAKE_SKIP_SECTIONS  Fraction of files a batched standards audit answer leaves
+                           out, to exercise the per-file fallback (default: 0)
+    ZA_FAKE_FAILURE_RATE   Probability that any one call fails, 0-1 (default: 0)
+    ZA_FAKE_RATE_LIMIT     Fraction of failures reported as HTTP 429 (default: 0.5)
+    ZA_FAKE_TAIL_RATE      Probability of a 10x slow call (default: 0)
+    ZA_FAKE_SEED           Seed for the response bodies (latency, failures and slow
+                           calls are drawn independently for every call)
+    ZA_FAKE_STARTUP        Seconds of start-up before the first prompt (default: 0),
+                           the cold start a pooled backend avoids
+
+Usage:
+    python scripts/fake_agent.py [--as gemini] [-p PROMPT] < prompt.txt
+    python scripts/fake_agent.py --as gemini --serve       # pool backend protocol
+    python scripts/fake_agent.py --as gemini --http 8765   # http backend stand-in
+"""
+
+import hashlib
+import json
+import os
+import random
+import sys
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+CHUNK_BYTES = 4096
+
+
+def env_float(name: str, default: float) -> float:
+    return float(os.environ.get(name, default))
+
+
+def respond(prompt: str, name: str, write) -> tuple[int, str]:
+    """
+    Answer one prompt: wait, then pass the response to write() chunk by chunk.
+
+    Returns:
+        (returncode, stderr)
+    """
+    # The response body is seeded per prompt so repeated runs of the same plan
+    # get the same answers; latency, failures and slow calls are drawn fresh
+    # for every call, so a retry of a failed prompt can succeed
+    digest = hashlib.sha256(prompt.encode("utf-8")).hexdigest()
+    rng = random.Random(f"{os.environ.get('ZA_FAKE_SEED', '')}:{digest}")
+    call = random.Random()
+
+    latency = env_float("ZA_FAKE_LATENCY", 0.05)
+    jitter = env_float("ZA_FAKE_JITTER", 0.5)
+    latency *= call.uniform(1 - jitter, 1 + jitter)
+    if call.random() < env_float("ZA_FAKE_TAIL_RATE", 0):
+        latency *= 10
+    ttfb = latency * env_float("ZA_FAKE_TTFB", 0.5)
+
+    if call.random() < env_float("ZA_FAKE_FAILURE_RATE", 0):
+        time.sleep(ttfb)
+        if call.random() < env_float("ZA_FAKE_RATE_LIMIT", 0.5):
+            return 1, "Error: 429 Too Many Requests (fake rate limit)"
+        return 1, "Error: 503 Service Unavailable (fake failure)"
+
+    time.sleep(ttfb)
+    size = int(env_float("ZA_FAKE_OUTPUT_BYTES", 2000))
+    if "Output ONLY valid JSON" in prompt:
+        # JSON shaped like an endpoint list, so contracts written by the fake can be sharded
+        count = int(env_float("ZA_FAKE_ENDPOINTS", 8))
+        notes = "x" * max(0, size // count - 60)
+        body = json.dumps({"agent": name, "prompt_sha256": digest[:12], "endpoints": [
+            {"method": "GET", "path": f"/api/items/{i}", "notes": notes} for i in range(count)
+        ]}, indent=1)
+    elif "### File: " in prompt and "## <file path>" in prompt:
+        # One section per file, like a batched standards audit expects
+        files = [line[len("### File: "):] for line in prompt.splitlines() if line.startswith("### File: ")]
+        skip = env_float("ZA_FAKE_SKIP_SECTIONS", 0)
+        per_file = max(40, size // len(files))
+        body = "".join(f"## {path}\n\n" + ("x" * 79 + "\n") * (per_file // 80 + 1) + "\n"
+                       for path in files if rng.random() >= skip)
+    else:
+        header = f"# {name} response\n\nPrompt: {len(prompt)} chars, sha256 {digest[:12]}\n\n"
+        size = max(len(header), size)
+        body = header + ("x" * 79 + "\n") * ((size - len(header)) // 80 + 1)
+        body = body[:size]
+
+    # Stream the rest of the latency out across the chunks
+    chunks = [body[i:i + CHUNK_BYTES] for i in range(0, len(body), CHUNK_BYTES)]
+    pause = (latency - ttfb) / len(chunks)
+    for chunk in chunks:
+        write(chunk)
+        time.sleep(pause)
+    return 0, ""
+
+
+def serve_stdio(name: str):
+    """Answer JSON-lines requests on stdin until it closes (agent_backends pool protocol)."""
+    time.sleep(env_float("ZA_FAKE_STARTUP", 0))
+    for line in sys.stdin:
+        request = json.loads(line)
+
+        def write(chunk):
+            sys.stdout.write(json.dumps({"id": request["id"], "chunk": chunk}) + "\n")
+            sys.stdout.flush()
+
+        returncode, stderr = respond(request["prompt"], name, write)
+        sys.stdout.write(json.dumps({"id": request["id"], "done": True,
+                                     "returncode": returncode, "stderr": stderr}) + "\n")
+        sys.stdout.flush()
+
+
+def serve_http(name: str, port: int):
+    """Answer POSTed prompts (agent_backends http protocol) until interrupted."""
+
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"  # keep-alive
+
+        def do_POST(self):
+            request = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+            parts = []
+            returncode, stderr = respond(request["prompt"], name, parts.append)
+            body = ("".join(parts) if returncode == 0 else stderr).encode("utf-8")
+            status = 200 if returncode == 0 else (429 if "429" in stderr else 503)
+            self.send_response(status)
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+
+    print(f"fake {name} listening on http://127.0.0.1:{port}/", file=sys.stderr)
+    ThreadingHTTPServer(("127.0.0.1", port), Handler).serve_forever()
+
+
+def main():
+    args = sys.argv[1:]
+    name = args[args.index("--as") + 1] if "--as" in args else "agent"
+    if "--serve" in args:
+        return serve_stdio(name)
+    if "--http" in args:
+        return serve_http(name, int(args[args.index("--http") + 1]))
+
+    time.sleep(env_float("ZA_FAKE_STARTUP", 0))
+    prompt = args[args.index("-p") + 1] if "-p" in args and args.index("-p") + 1 < len(args) else ""
+    if not sys.stdin.isatty():
+        prompt = "\n".join(part for part in (prompt, sys.stdin.read()) if part)
+
+    def write(chunk):
+        sys.stdout.write(chunk)
+        sys.stdout.flush()
+
+    returncode, stderr = respond(prompt, name, write)
+    if returncode:
+        print(stderr, file=sys.stderr)
+        sys.exit(returncode)
+
+
+if __name__ == "__main__":
+    main()
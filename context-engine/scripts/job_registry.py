@@ -0,0 +1,201 @@
+#!/usr/bin/env python3
+"""
+Zero Ambiguity Job Registry
+
+SQLite index of executor jobs, so `executor.py --status` does not have to
+walk subagent_runs/ and parse every status.json on each call.
+
+Each job directory's status.json stays the source of truth; every status
+transition is also upserted here. The database runs in WAL mode so
+concurrent workers can write while --status reads, and it can be rebuilt
+from the job directories and archives at any time
+(`executor.py --rebuild-registry`).
+
+Jobs packed into a day archive by `executor.py --compact` keep their row;
+the archived table records which archive now holds their files.
+"""
+
+import json
+import sqlite3
+import zipfile
+from contextlib import closing
+from pathlib import Path
+
+# status.json fields mirrored into the jobs table
+COLUMNS = (
+    "job_id", "ticket_id", "ticket_title", "agent", "status", "queued_at", "started_at",
+    "finished_at", "exit_code", "duration_ms", "ttfb_ms", "output_bytes", "cache", "error",
+    "attempts", "failure", "answered_by", "call_ms",
+)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    job_id TEXT PRIMARY KEY,
+    ticket_id INTEGER,
+    ticket_title TEXT,
+    agent TEXT,
+    status TEXT,
+    queued_at TEXT,
+    started_at TEXT,
+    finished_at TEXT,
+    exit_code INTEGER,
+    duration_ms INTEGER,
+    ttfb_ms INTEGER,
+    output_bytes INTEGER,
+    cache TEXT,
+    error TEXT,
+    attempts INTEGER,
+    failure TEXT,
+    answered_by TEXT,
+    call_ms INTEGER
+);
+CREATE INDEX IF NOT EXISTS jobs_queued_at ON jobs (queued_at);
+CREATE INDEX IF NOT EXISTS jobs_ticket ON jobs (ticket_id, queued_at);
+CREATE INDEX IF NOT EXISTS jobs_status ON jobs (status);
+CREATE TABLE IF NOT EXISTS archived (
+    job_id TEXT PRIMARY KEY,
+    archive TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS archived_archive ON archived (archive);
+"""
+
+JOB_SELECT = "SELECT jobs.*, archived.archive FROM jobs LEFT JOIN archived USING (job_id)"
+
+UPSERT = (
+    f"INSERT INTO jobs ({', '.join(COLUMNS)}) VALUES ({', '.join('?' for _ in COLUMNS)}) "
+    f"ON CONFLICT (job_id) DO UPDATE SET "
+    + ", ".join(f"{c} = excluded.{c}" for c in COLUMNS[1:])
+)
+
+
+class JobRegistry:
+    """Indexed job status store backed by a WAL-mode SQLite file."""
+
+    def __init__(self, db_path):
+        self.db_path = Path(db_path)
+
+    def connect(self) -> sqlite3.Connection:
+        """Open a connection (one per call, so threads and worker processes never share one)."""
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        conn = sqlite3.connect(self.db_path, timeout=30)
+        conn.row_factory = sqlite3.Row
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.executescript(SCHEMA)
+        # Add columns introduced after the database was created
+        existing = {row["name"] for row in conn.execute("PRAGMA table_info(jobs)")}
+        for column in COLUMNS:
+            if column not in existing:
+                conn.execute(f"ALTER TABLE jobs ADD COLUMN {column}")
+        return conn
+
+    def record(self, status: dict):
+        """Insert or update a job from its status.json contents."""
+        with closing(self.connect()) as conn, conn:
+            conn.execute(UPSERT, [status.get(c) for c in COLUMNS])
+
+    def summary(self) -> dict:
+        """Job counts: total plus one entry per status."""
+        with closing(self.connect()) as conn:
+            rows = conn.execute("SELECT status, COUNT(*) AS n FROM jobs GROUP BY status").fetchall()
+        counts = {row["status"]: row["n"] for row in rows}
+        return {"total": sum(counts.values()), **counts}
+
+    def recent(self, limit: int = 10) -> list[dict]:
+        """The most recently queued jobs, oldest first."""
+        with closing(self.connect()) as conn:
+            rows = conn.execute(
+                f"{JOB_SELECT} ORDER BY queued_at DESC, job_id DESC LIMIT ?", (limit,)
+            ).fetchall()
+        return [dict(row) for row in reversed(rows)]
+
+    def ticket_history(self, ticket_id: int) -> list[dict]:
+        """Every job run for a ticket, oldest first."""
+        with closing(self.connect()) as conn:
+            rows = conn.execute(
+                f"{JOB_SELECT} WHERE ticket_id = ? ORDER BY queued_at, job_id", (ticket_id,)
+            ).fetchall()
+        return [dict(row) for row in rows]
+
+    def durations(self, agent: str, limit: int = 500) -> list[int]:
+        """
+        call_ms of the agent's most recent completed, uncached jobs that it
+        answered itself: the successful agent call alone, without the retry
+        backoff and rate-limit waits that duration_ms includes.
+        """
+        with closing(self.connect()) as conn:
+            rows = conn.execute(
+                "SELECT call_ms FROM jobs WHERE agent = ? AND status = 'completed' AND cache != 'hit' "
+                "AND (answered_by IS NULL OR answered_by = agent) AND call_ms > 0 "
+                "ORDER BY queued_at DESC LIMIT ?",
+                (agent, limit),
+            ).fetchall()
+        return [row["call_ms"] for row in rows]
+
+    def get(self, job_id: str) -> dict | None:
+        """One job's row (with its archive, if compacted), or None."""
+        with closing(self.connect()) as conn:
+            row = conn.execute(f"{JOB_SELECT} WHERE job_id = ?", (job_id,)).fetchone()
+        return dict(row) if row else None
+
+    def unarchived(self, statuses: tuple[str, ...]) -> list[dict]:
+        """Jobs in one of statuses whose files are still in a job directory, newest first."""
+        with closing(self.connect()) as conn:
+            rows = conn.execute(
+                f"{JOB_SELECT} WHERE archived.archive IS NULL AND jobs.status IN ({', '.join('?' for _ in statuses)}) "
+                f"ORDER BY queued_at DESC, job_id DESC",
+                statuses,
+            ).fetchall()
+        return [dict(row) for row in rows]
+
+    def mark_archived(self, job_ids: list[str], archive: str):
+        with closing(self.connect()) as conn, conn:
+            conn.executemany("INSERT OR REPLACE INTO archived (job_id, archive) VALUES (?, ?)",
+                             [(job_id, archive) for job_id in job_ids])
+
+    def forget_archive(self, archive: str) -> int:
+        """Drop every job stored in an archive that has been deleted. Returns the job count."""
+        with closing(self.connect()) as conn, conn:
+            conn.execute("DELETE FROM jobs WHERE job_id IN (SELECT job_id FROM archived WHERE archive = ?)",
+                         (archive,))
+            return conn.execute("DELETE FROM archived WHERE archive = ?", (archive,)).rowcount
+
+    def is_empty(self) -> bool:
+        with closing(self.connect()) as conn:
+            return conn.execute("SELECT 1 FROM jobs LIMIT 1").fetchone() is None
+
+    def rebuild(self, runs_dir, archive_dir=None) -> int:
+        """
+        Replace the registry contents with the status.json of every job
+        directory and of every job packed into an archive in archive_dir.
+
+        Returns:
+            The number of jobs indexed.
+        """
+        statuses = []
+        for status_file in Path(runs_dir).glob("*/status.json"):
+            try:
+                with open(status_file, "r", encoding="utf-8") as f:
+                    statuses.append(json.load(f))
+            except (OSError, json.JSONDecodeError):
+                continue  # job being written right now, or damaged
+
+        archived = []
+        for archive in sorted(Path(archive_dir).glob("*.zip")) if archive_dir else []:
+            try:
+                with zipfile.ZipFile(archive) as zf:
+                    for name in zf.namelist():
+                        if name.endswith("/status.json"):
+                            status = json.loads(zf.read(name))
+                            statuses.append(status)
+                            archived.append((status.get("job_id"), archive.name))
+            except (OSError, zipfile.BadZipFile, json.JSONDecodeError):
+                continue
+
+        with closing(self.connect()) as conn, conn:
+            conn.execute("DELETE FROM jobs")
+            conn.execute("DELETE FROM archived")
+            conn.executemany(UPSERT, [[s.get(c) for c in COLUMNS] for s in statuses if s.get("job_id")])
+            conn.executemany("INSERT OR REPLACE INTO archived (job_id, archive) VALUES (?, ?)",
+                             [pair for pair in archived if pair[0]])
+        return len(statuses)
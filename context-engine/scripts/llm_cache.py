@@ -0,0 +1,159 @@
+#!/usr/bin/env python3
+"""
+Zero Ambiguity LLM Response Cache
+
+Content-addressed on-disk cache for agent CLI responses, shared by
+orchestrator.py, executor.py and standards.py.
+
+A response is keyed by a SHA-256 of the agent name, the command template
+(model and flags, without the prompt) and the full prompt, so only
+byte-identical requests are ever served from cache. Only successful
+responses are stored.
+
+Modes:
+    use      - read and write the cache (default)
+    refresh  - skip cached responses but store the fresh ones (--refresh)
+    off      - bypass the cache entirely (--no-cache)
+
+Eviction removes entries unused for longer than max_age_days, then the
+least recently used entries until the cache fits in max_bytes. It scans the
+whole cache, so writes only trigger it when the last eviction by any
+process (the mtime of EVICT_MARKER) is over EVICT_INTERVAL_SECONDS old, or
+once this process has written a tenth of max_bytes since its last one.
+"""
+
+import hashlib
+import json
+import os
+import tempfile
+import time
+from datetime import datetime
+from pathlib import Path
+
+DEFAULT_MAX_BYTES = 200 * 1024 * 1024  # 200 MB
+DEFAULT_MAX_AGE_DAYS = 30
+EVICT_INTERVAL_SECONDS = 3600
+EVICT_MARKER = ".last-evicted"
+
+MODES = ("use", "refresh", "off")
+
+
+def cache_key(agent: str, cmd: list[str], prompt: str) -> str:
+    """Hash the agent, its command template and the full prompt."""
+    payload = json.dumps({"agent": agent.lower(), "cmd": cmd, "prompt": prompt}, sort_keys=True)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def mode_from_flags(no_cache: bool = False, refresh: bool = False) -> str:
+    """Translate --no-cache / --refresh into a cache mode."""
+    if no_cache:
+        return "off"
+    if refresh:
+        return "refresh"
+    return "use"
+
+
+class LLMCache:
+    """On-disk response cache with age/size eviction and hit/miss counters."""
+
+    def __init__(self, cache_dir, mode: str = "use",
+                 max_bytes: int = DEFAULT_MAX_BYTES, max_age_days: float = DEFAULT_MAX_AGE_DAYS):
+        if mode not in MODES:
+            raise ValueError(f"Unknown cache mode: {mode}. Supported: {list(MODES)}")
+        self.cache_dir = Path(cache_dir)
+        self.mode = mode
+        self.max_bytes = max_bytes
+        self.max_age_seconds = max_age_days * 86400
+        self.hits = 0
+        self.misses = 0
+        self.written_bytes = 0  # since this process last evicted
+        self.next_eviction = None  # time.time() at which eviction is due, read from EVICT_MARKER
+
+    def _entry_path(self, key: str) -> Path:
+        return self.cache_dir / key[:2] / f"{key}.json"
+
+    def get(self, key: str) -> str | None:
+        """Return the cached output for key, or None on a miss."""
+        if self.mode != "use":
+            if self.mode == "refresh":
+                self.misses += 1
+            return None
+
+        path = self._entry_path(key)
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                entry = json.load(f)
+            os.utime(path)  # mark as recently used for LRU eviction
+        except (FileNotFoundError, json.JSONDecodeError):
+            self.misses += 1
+            return None
+
+        self.hits += 1
+        return entry["output"]
+
+    def put(self, key: str, output: str, agent: str = ""):
+        """Store a successful response, evicting stale or excess entries when due."""
+        if self.mode == "off":
+            return
+
+        path = self._entry_path(key)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        entry = {
+            "key": key,
+            "agent": agent,
+            "created_at": datetime.utcnow().isoformat() + "Z",
+            "output": output,
+        }
+        # Write atomically so concurrent workers never read a partial entry
+        fd, tmp_path = tempfile.mkstemp(dir=path.parent, suffix=".tmp")
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            json.dump(entry, f)
+            self.written_bytes += f.tell()
+        os.replace(tmp_path, path)
+
+        if self.eviction_due():
+            self.evict()
+
+    def eviction_due(self) -> bool:
+        if self.written_bytes > self.max_bytes // 10:
+            return True
+        if self.next_eviction is None:
+            try:
+                last = (self.cache_dir / EVICT_MARKER).stat().st_mtime
+            except FileNotFoundError:
+                last = 0
+            self.next_eviction = last + EVICT_INTERVAL_SECONDS
+        return time.time() >= self.next_eviction
+
+    def evict(self):
+        """Drop entries older than max_age_days, then LRU entries over max_bytes."""
+        entries = []
+        now = time.time()
+        self.written_bytes = 0
+        self.next_eviction = now + EVICT_INTERVAL_SECONDS
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        (self.cache_dir / EVICT_MARKER).touch()
+        for path in self.cache_dir.glob("*/*.json"):
+            try:
+                stat = path.stat()
+                if now - stat.st_mtime > self.max_age_seconds:
+                    path.unlink()
+                    continue
+            except FileNotFoundError:
+                continue  # removed by another process
+            entries.append((stat.st_mtime, stat.st_size, path))
+
+        total = sum(size for _, size, _ in entries)
+        for _, size, path in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            try:
+                path.unlink()
+            except FileNotFoundError:
+                pass
+            total -= size
+
+    def summary(self) -> str:
+        if self.mode == "off":
+            return "LLM cache disabled (--no-cache)"
+        return f"LLM cache: {self.hits} hit(s), {self.misses} miss(es)"
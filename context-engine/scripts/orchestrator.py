@@ -9,6 +9,19 @@ This ensures no context is dropped and no steps are skipped.
 
 Usage:
     python scripts/orchestrator.py
+    python scripts/orchestrator.py --refresh    # Ignore cached LLM responses
+    python scripts/orchestrator.py --no-cache   # Bypass the LLM cache entirely
+    python scripts/orchestrator.py --force      # Rebuild every phase
+    python scripts/orchestrator.py --profile    # Print where the time went (trace in .cache/traces)
+    python scripts/orchestrator.py --fixture-workers 8   # Endpoints generating fixtures at once
+    python scripts/orchestrator.py --archaeology map-reduce   # Summarize code per category, then merge
+
+Incremental rebuilds:
+    specs/.build-manifest.json records the hash of every input each artifact
+    was built from. A phase reruns only when its output is missing or one of
+    its inputs changed; rebuilt outputs in turn invalidate downstream phases.
+    Artifacts that predate the manifest are adopted as up to date, unless
+    one of the artifacts they are built from was rebuilt earlier in the run.
 
 Prerequisites:
     - A 00-Brief.md file must exist in context-engine/specs/
@@ -17,10 +30,25 @@ Prerequisites:
 See guides/council-workflow.md for detailed explanation.
 """
 
+import argparse
+import hashlib
 import os
 import subprocess
 import sys
 import json
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from datetime import datetime
+
+from agent_backends import AgentCallError, AgentRegistry, agent_configs
+from context_packer import (
+    CHARS_PER_TOKEN, PRIORITY_BRIEF, PRIORITY_CODE, PRIORITY_DOMAIN, PRIORITY_SPEC,
+    context_budget, describe_dropped, estimate_tokens, make_section,
+    pack_sections, render_sections, sections_text,
+)
+from llm_cache import LLMCache, cache_key, mode_from_flags
+from retrieval import BM25Index, split_markdown_sections
+import tracing
 
 # --- CONFIGURATION ---
 # Paths relative to project root (run from project root)
@@ -39,8 +67,22 @@ FILES = {
     "FIXTURES": os.path.join(DIRS["SPECS"], "03-fixtures.json"),
     "UI": os.path.join(DIRS["SPECS"], "04-ui-specs.md"),
     "PLAN": os.path.join(DIRS["SPECS"], "05-implementation-plan.md"),
+    "MANIFEST": os.path.join(DIRS["SPECS"], ".build-manifest.json"),
+    "INFRA_INDEX": os.path.join("context-engine", ".cache", "infra-index.json"),
 }
 
+AGENTS = agent_configs()
+AGENT_BACKENDS = AgentRegistry(AGENTS)
+
+# Context window per agent, in tokens (the packer fits prompts into these)
+CONTEXT_WINDOWS = {
+    "Auggie": 200000,
+    "Gemini": 1000000,
+}
+
+# Shared LLM response cache (mode is set from the command line in main)
+LLM_CACHE = LLMCache(os.path.join("context-engine", ".cache", "llm"))
+
 # Directories to scan for existing infrastructure
 SCAN_DIRS = {
     "models": ["app/Models", "src/models", "models"],
@@ -49,6 +91,64 @@ SCAN_DIRS = {
     "routes": ["routes", "src/routes"],
     "components": ["resources/views/components", "src/components", "components"],
 }
+CODE_EXTENSIONS = ('.php', '.py', '.ts', '.js', '.sql', '.json', '.vue', '.jsx', '.tsx')
+MAX_SCAN_LINES = 500  # Larger files are left out to avoid context overflow
+DOMAIN_CONTEXT_BUDGET = 12000  # Tokens of Brief-relevant domain-context sections
+SCAN_WORKERS = 8
+
+# Phase C generates fixtures per API endpoint, this many endpoints at a time
+FIXTURE_WORKERS = 4
+FIXTURE_SHARED_MAX_CHARS = 2000  # Top-level contract entries up to this size go into every shard
+
+# Phase 0 map-reduce archaeology (--archaeology): when the scanned code
+# doesn't fit the Archaeologist's window, it is summarized per category in
+# chunks of this many tokens, this many chunks at a time, then reduced.
+ARCHAEOLOGY_MODES = ("auto", "single", "map-reduce")
+ARCHAEOLOGY_CHUNK_TOKENS = 40000
+ARCHAEOLOGY_WORKERS = 4
+
+ARCHAEOLOGY_PROMPT = """Analyze the existing infrastructure and the Brief.
+
+IMPORTANT: If Domain Contexts are provided, use them to understand:
+1. Business rules and intent (WHY things work the way they do)
+2. Code navigation (WHERE to find related files and HOW they connect)
+
+Your task:
+1. Identify which existing tables/models are relevant to this feature
+2. Identify which existing API endpoints can be reused
+3. Identify what is NET NEW (must be created)
+4. Flag potential conflicts or constraints
+
+Output a structured analysis following this format:
+
+## Existing Infrastructure to REUSE
+[List tables, endpoints, models that already exist and should NOT be recreated]
+
+## Existing Infrastructure to EXTEND
+[List what needs modification - e.g., "Add 'status' column to events table"]
+
+## Net New Infrastructure
+[List what must be created from scratch]
+
+## Constraints & Warnings
+[List any conflicts, dependencies, or things to avoid]
+
+Be specific. Reference actual table names, column names, and file paths from the existing code."""
+
+ARCHAEOLOGY_MAP_PROMPT = """Summarize this slice of the project's existing {category} code as a factual inventory.
+
+For every file, under a "### <file path>" heading, list:
+- Tables, models and classes it defines, with their columns/fields and types
+- Relationships to other models or tables
+- Routes and endpoints (HTTP method, path, handler)
+- Validation and business rules it enforces
+
+Be terse and exact: use the real names from the code and do not speculate."""
+
+ARCHAEOLOGY_MERGE_PROMPT = """Merge these summaries of existing code into one inventory.
+
+Keep every file path, table, column, model, relationship, endpoint and rule; only remove
+repetition. Keep the "### <file path>" headings."""
 
 
 def ensure_dirs():
@@ -57,47 +157,186 @@ def ensure_dirs():
         os.makedirs(d, exist_ok=True)
 
 
-def scan_existing_infrastructure():
+def load_infra_index():
+    """Load the persistent scan index ({path: entry}), or an empty one."""
+    try:
+        with open(FILES["INFRA_INDEX"], 'r') as f:
+            return json.load(f)
+    except (FileNotFoundError, json.JSONDecodeError):
+        return {}
+
+
+def save_infra_index(index):
+    os.makedirs(os.path.dirname(FILES["INFRA_INDEX"]), exist_ok=True)
+    with open(FILES["INFRA_INDEX"], 'w') as f:
+        json.dump(index, f, separators=(',', ':'), sort_keys=True)
+
+
+@tracing.traced("index_infrastructure")
+def index_existing_infrastructure():
     """
-    Scan the project for existing code that might be relevant.
+    Walk SCAN_DIRS and return an index entry for every code file.
+
+    Entries (path, category, mtime, size, lines, sha256) persist in
+    FILES["INFRA_INDEX"]. Files whose mtime and size are unchanged since the
+    last run are only stat'ed; new or modified files are re-read and hashed.
 
     Returns:
-        A string containing relevant existing code snippets, or empty string if none found.
+        A list of index entries in scan order.
     """
-    found_files = []
+    previous = load_infra_index()
+    index = {}
+    entries = []
+    reread = 0
 
     for category, paths in SCAN_DIRS.items():
         for path in paths:
             if os.path.exists(path):
                 print(f"   🔍 Scanning {path}...")
                 for root, dirs, files in os.walk(path):
-                    for file in files:
+                    dirs.sort()
+                    for file in sorted(files):
                         # Skip non-code files
-                        if not file.endswith(('.php', '.py', '.ts', '.js', '.sql', '.json', '.vue', '.jsx', '.tsx')):
+                        if not file.endswith(CODE_EXTENSIONS):
                             continue
 
                         filepath = os.path.join(root, file)
                         try:
-                            with open(filepath, 'r') as f:
-                                content = f.read()
-
-                            # Only include files under 500 lines to avoid context overflow
-                            if content.count('\n') < 500:
-                                found_files.append(f"\n### {filepath}\n```\n{content}\n```\n")
-                        except Exception as e:
+                            stat = os.stat(filepath)
+                            entry = previous.get(filepath)
+                            if not entry or entry["mtime"] != stat.st_mtime or entry["size"] != stat.st_size:
+                                digest = hashlib.sha256()
+                                lines = 0
+                                with open(filepath, 'rb') as f:
+                                    for chunk in iter(lambda: f.read(65536), b''):
+                                        digest.update(chunk)
+                                        lines += chunk.count(b'\n')
+                                entry = {
+                                    "path": filepath,
+                                    "mtime": stat.st_mtime,
+                                    "size": stat.st_size,
+                                    "lines": lines,
+                                    "sha256": digest.hexdigest(),
+                                }
+                                reread += 1
+                            entry["category"] = category
+                            index[filepath] = entry
+                            entries.append(entry)
+                        except OSError as e:
                             print(f"   ⚠️  Could not read {filepath}: {e}")
                 break  # Only use first matching path per category
 
-    if not found_files:
-        return ""
+    if index != previous:
+        save_infra_index(index)
+    if entries:
+        print(f"   📇 Indexed {len(entries)} files ({reread} new or changed)")
+    tracing.annotate(files=len(entries), reread=reread)
+    return entries
+
 
-    # Limit total context to prevent token overflow
-    combined = "".join(found_files)
-    if len(combined) > 100000:  # ~25k tokens
-        print("   ⚠️  Truncating infrastructure scan (too much code)")
-        combined = combined[:100000] + "\n\n[TRUNCATED - Too much code to include]"
+def infrastructure_digest(entries):
+    """Hash of the paths and contents of every file the scan would include."""
+    included = [f"{e['path']}:{e['sha256']}" for e in entries if e["lines"] < MAX_SCAN_LINES]
+    return hash_content("\n".join(included)) if included else ""
 
-    return combined
+
+def read_code_file(filepath, max_lines=MAX_SCAN_LINES):
+    """
+    Stream a file line by line, giving up once it reaches max_lines.
+
+    Returns:
+        The file content, or None if the file has max_lines or more lines.
+    """
+    parts = []
+    newlines = 0
+    with open(filepath, 'r') as f:
+        for line in f:
+            if line.endswith('\n'):
+                newlines += 1
+                if newlines >= max_lines:
+                    return None
+            parts.append(line)
+    return "".join(parts)
+
+
+def iter_code_sections(entries):
+    """
+    Yield (entry, section) for every indexed file under MAX_SCAN_LINES lines.
+
+    Files are read in a thread pool but yielded in index order (SCAN_DIRS
+    category order, then path), so results are reproducible. Reads run a
+    bounded window ahead of the consumer; stop iterating to cancel the rest.
+    """
+    candidates = iter([e for e in entries if e["lines"] < MAX_SCAN_LINES])
+
+    with ThreadPoolExecutor(max_workers=SCAN_WORKERS) as pool:
+        # Keep a bounded window of reads in flight ahead of the consumer
+        pending = deque()
+
+        def fill():
+            while len(pending) < SCAN_WORKERS * 2:
+                entry = next(candidates, None)
+                if entry is None:
+                    return
+                pending.append((entry, pool.submit(read_code_file, entry["path"])))
+
+        try:
+            fill()
+            while pending:
+                entry, future = pending.popleft()
+                filepath = entry["path"]
+                try:
+                    content = future.result()
+                except Exception as e:
+                    print(f"   ⚠️  Could not read {filepath}: {e}")
+                    fill()
+                    continue
+                fill()
+                if content is None:
+                    continue  # Grew past the line limit since it was indexed
+
+                yield entry, make_section("EXISTING CODE", f"\n### {filepath}\n```\n{content}\n```\n",
+                                          PRIORITY_CODE, title=filepath)
+        finally:
+            for _, future in pending:
+                future.cancel()
+
+
+@tracing.traced("scan_infrastructure")
+def scan_existing_infrastructure(entries=None, budget_tokens=None):
+    """
+    Scan the project for existing code that might be relevant.
+
+    Reading stops at the first file that no longer fits in the token budget.
+
+    Args:
+        entries: Index entries from index_existing_infrastructure() (indexed on demand if omitted)
+        budget_tokens: Maximum tokens of code to read (defaults to the Archaeologist's window)
+
+    Returns:
+        A list of context sections, one per file (empty if none found).
+    """
+    if entries is None:
+        entries = index_existing_infrastructure()
+    if budget_tokens is None:
+        budget_tokens = context_budget(CONTEXT_WINDOWS["Auggie"])
+
+    found_files = []
+    used = 0
+    omitted = 0
+
+    for entry, section in iter_code_sections(entries):
+        if used + section["tokens"] > budget_tokens:
+            omitted = 1 + sum(1 for e in entries[entries.index(entry) + 1:] if e["lines"] < MAX_SCAN_LINES)
+            break
+        found_files.append(section)
+        used += section["tokens"]
+
+    if omitted:
+        print(f"   ⚠️  Infrastructure scan hit the {budget_tokens}-token budget ({omitted} files left out)")
+
+    tracing.annotate(files=len(found_files), omitted=omitted, bytes=len(sections_text(found_files)))
+    return found_files
 
 
 def read_file(filepath):
@@ -108,42 +347,47 @@ def read_file(filepath):
     return None
 
 
-def load_domain_contexts(brief_content):
+@tracing.traced("load_domain_contexts")
+def load_domain_contexts(brief_content, budget_tokens=DOMAIN_CONTEXT_BUDGET):
     """
-    Load relevant domain context files based on keywords in the Brief.
+    Load relevant domain context sections based on keywords in the Brief.
 
     Domain contexts contain:
     1. Business intent - WHY things work the way they do
     2. Code navigation - WHERE to find things, HOW to trace through the code
 
+    Every file is split into heading sections, the sections are ranked
+    against the Brief with BM25, and the best-ranked sections are kept
+    until the token budget is spent. Sections that share no terms with the
+    Brief are never included.
+
     Args:
         brief_content: The Brief content to scan for domain keywords
+        budget_tokens: Maximum tokens of domain context to return
 
     Returns:
-        Concatenated domain context content, or empty string if none found.
+        A list of context sections, most relevant first (empty if none found).
     """
     domain_contexts_dir = DIRS["DOMAIN_CONTEXTS"]
 
     if not os.path.exists(domain_contexts_dir):
         print("   📂 No domain-contexts directory found")
-        return ""
+        return []
 
     # Get all domain context files
     context_files = []
-    for file in os.listdir(domain_contexts_dir):
+    for file in sorted(os.listdir(domain_contexts_dir)):
         if file.endswith('.md'):
             filepath = os.path.join(domain_contexts_dir, file)
             context_files.append((file, filepath))
 
     if not context_files:
         print("   📂 No domain context files found")
-        return ""
+        return []
 
     print(f"   📚 Found {len(context_files)} domain context files")
 
-    # Load all domain contexts (they're curated knowledge, should be included)
-    # In a more sophisticated version, we could filter based on Brief keywords
-    loaded_contexts = []
+    chunks = []
     for filename, filepath in context_files:
         try:
             with open(filepath, 'r') as f:
@@ -154,48 +398,156 @@ def load_domain_contexts(brief_content):
                 print(f"      ⏭️  Skipping template: {filename}")
                 continue
 
-            loaded_contexts.append(f"\n### Domain Context: {filename}\n{content}\n")
-            print(f"      ✅ Loaded: {filename}")
+            chunks.extend(split_markdown_sections(content, filename))
         except Exception as e:
             print(f"      ⚠️  Could not read {filename}: {e}")
 
-    if not loaded_contexts:
-        return ""
+    # Rank sections against the Brief and keep the best ones within budget
+    loaded_contexts = []
+    used = 0
+    ranked = BM25Index(chunks).search(brief_content)
+    for score, chunk in ranked:
+        section = make_section(
+            "DOMAIN CONTEXTS (Business Intent + Code Navigation)",
+            f"\n### Domain Context: {chunk['source']} - {chunk['heading']}\n{chunk['text']}\n",
+            PRIORITY_DOMAIN,
+            title=f"{chunk['source']}#{chunk['heading']}",
+        )
+        if used + section["tokens"] > budget_tokens:
+            continue
+        loaded_contexts.append(section)
+        used += section["tokens"]
+
+    print(f"      ✅ Selected {len(loaded_contexts)} of {len(chunks)} sections "
+          f"({len(ranked)} relevant to the Brief)")
+    tracing.annotate(sections=len(loaded_contexts), chunks=len(chunks))
+    return loaded_contexts
+
 
-    combined = "".join(loaded_contexts)
+def hash_content(content):
+    """SHA-256 of a text input (None hashes like an empty string)."""
+    return hashlib.sha256((content or "").encode("utf-8")).hexdigest()
 
-    # Limit to prevent token overflow
-    if len(combined) > 50000:  # ~12k tokens
-        print("   ⚠️  Truncating domain contexts (too large)")
-        combined = combined[:50000] + "\n\n[TRUNCATED - Domain contexts too large]"
 
-    return combined
+# Artifacts regenerated by this run (adopted ones excluded); an input named
+# after one (e.g. "schema" for SCHEMA) is that artifact's content
+REBUILT_THIS_RUN = set()
 
 
+def load_manifest():
+    """Load the build manifest, or an empty one if it doesn't exist yet."""
+    content = read_file(FILES["MANIFEST"])
+    return json.loads(content) if content else {"artifacts": {}}
+
+
+def save_manifest(manifest):
+    with open(FILES["MANIFEST"], 'w') as f:
+        json.dump(manifest, f, indent=2, sort_keys=True)
+
+
+def needs_rebuild(manifest, artifact, inputs, force=False):
+    """
+    Decide whether an artifact must be regenerated.
+
+    Args:
+        manifest: The loaded build manifest
+        artifact: Key into FILES (e.g. "SCHEMA")
+        inputs: Mapping of input name -> content the artifact is built from
+        force: Rebuild regardless of the manifest
+
+    Returns:
+        A reason string if the artifact is stale, otherwise None.
+    """
+    if force:
+        return "forced rebuild"
+    if not os.path.exists(FILES[artifact]):
+        return "artifact missing"
+
+    entry = manifest["artifacts"].get(artifact)
+    hashes = {name: hash_content(content) for name, content in inputs.items()}
+    if entry is None:
+        # Built before the manifest existed - adopt it as up to date, unless an
+        # artifact it is built from was regenerated in this run
+        rebuilt = sorted(name for name in inputs if name.upper() in REBUILT_THIS_RUN)
+        if rebuilt:
+            return f"not in manifest and rebuilt inputs: {', '.join(rebuilt)}"
+        record_build(manifest, artifact, inputs, adopted=True)
+        return None
+
+    changed = sorted(name for name in hashes if entry["inputs"].get(name) != hashes[name])
+    if changed:
+        return f"inputs changed: {', '.join(changed)}"
+    return None
+
+
+def record_build(manifest, artifact, inputs, adopted=False):
+    """Record the inputs an artifact was (re)built from and persist the manifest."""
+    if not adopted:
+        REBUILT_THIS_RUN.add(artifact)
+    manifest["artifacts"][artifact] = {
+        "inputs": {name: hash_content(content) for name, content in inputs.items()},
+        "output": hash_content(read_file(FILES[artifact])),
+        "built_at": datetime.utcnow().isoformat() + "Z",
+    }
+    save_manifest(manifest)
+
+
+@tracing.traced("write_artifact")
 def save_file(filepath, content):
     """Save the artifact to disk."""
     with open(filepath, 'w') as f:
         f.write(content)
+    tracing.annotate(file=filepath, bytes=len(content.encode("utf-8")))
     print(f"  💾 Saved artifact: {filepath}")
 
 
+@tracing.traced("pack_context")
+def pack_context(agent_name, sections, overhead=""):
+    """
+    Fit context sections into the agent's window by priority.
+
+    Whole sections are kept or dropped; anything dropped is reported on the
+    console and noted at the end of the context.
+    """
+    window = CONTEXT_WINDOWS.get(agent_name, min(CONTEXT_WINDOWS.values()))
+    budget = context_budget(window, overhead)
+    kept, dropped = pack_sections(sections, budget)
+    context = render_sections(kept)
+    used = sum(s["tokens"] for s in kept)
+    tracing.annotate(kept=len(kept), dropped=len(dropped), tokens=used, budget=budget)
+    print(f"   📦 Packed {len(kept)} context section(s), ~{used}/{budget} tokens")
+    if dropped:
+        print(f"   ✂️  Left out {describe_dropped(dropped)}")
+        context += f"\n\n[OMITTED - {len(dropped)} section(s) did not fit: " \
+                   f"{', '.join(s['title'] for s in dropped)}]"
+    return context
+
+
+@tracing.traced("agent_call", "agent")
 def run_agent_command(agent_name, system_role, prompt, context_content):
     """
     The Relay Mechanism.
 
-    Calls the appropriate AI CLI tool based on agent_name.
+    Sends the prompt to agent_name's backend (see agent_backends.py).
 
     Args:
         agent_name: Which agent to use ("Auggie" or "Gemini")
         system_role: The persona for this phase
         prompt: The task instruction
-        context_content: All context files concatenated
+        context_content: Context sections (packed into the agent's window), or a
+            pre-rendered string
 
     Returns:
         The agent's output string
+
+    Raises:
+        AgentCallError: the call failed (the reason has been printed)
     """
     print(f"\n🤖 Waking up {agent_name} ({system_role})...")
 
+    if isinstance(context_content, list):
+        context_content = pack_context(agent_name, context_content, overhead=system_role + prompt)
+
     full_prompt = f"""
 ROLE: {system_role}
 
@@ -206,44 +558,33 @@ TASK:
 {prompt}
 """
 
-    try:
-        if agent_name == "Auggie":
-            # Call Augment CLI (assuming 'auggie' command exists)
-            print(f"   ...calling auggie CLI...")
-            process = subprocess.run(
-                ["auggie", "-p", full_prompt],
-                capture_output=True,
-                text=True,
-                timeout=300  # 5 minute timeout
-            )
+    if agent_name not in AGENT_BACKENDS:
+        print(f"   ❌ Unknown agent: {agent_name}")
+        raise AgentCallError(f"Unknown agent: {agent_name}")
+    backend = AGENT_BACKENDS.get(agent_name)
 
-            if process.returncode != 0:
-                print(f"   ⚠️  auggie returned error code {process.returncode}")
-                print(f"   stderr: {process.stderr}")
-                sys.exit(1)
-
-            return process.stdout.strip()
-
-        elif agent_name == "Gemini":
-            # Call Gemini CLI (assuming 'gemini' command exists)
-            print(f"   ...calling gemini CLI...")
-            process = subprocess.run(
-                ["gemini", "-p", full_prompt],
-                capture_output=True,
-                text=True,
-                timeout=300  # 5 minute timeout
-            )
+    key = cache_key(agent_name, backend.identity, full_prompt)
+    cached = LLM_CACHE.get(key)
+    tracing.annotate(agent=agent_name, role=system_role, prompt_bytes=len(full_prompt.encode("utf-8")),
+                     cache="off" if LLM_CACHE.mode == "off" else ("hit" if cached is not None else "miss"))
+    if cached is not None:
+        print(f"   ⚡ Cache hit - reusing previous {agent_name} response")
+        tracing.annotate(response_bytes=len(cached.encode("utf-8")))
+        return cached
 
-            if process.returncode != 0:
-                print(f"   ⚠️  gemini returned error code {process.returncode}")
-                print(f"   stderr: {process.stderr}")
-                sys.exit(1)
+    try:
+        print(f"   ...calling {agent_name.lower()} ({backend.kind} backend)...")
+        returncode, output, stderr = backend.run(full_prompt)
 
-            return process.stdout.strip()
+        if returncode != 0:
+            print(f"   ⚠️  {agent_name.lower()} returned error code {returncode}")
+            print(f"   stderr: {stderr}")
+            raise AgentCallError(f"{agent_name} returned error code {returncode}")
 
-        else:
-            print(f"   ❌ Unknown agent: {agent_name}")
-            sys.exit(1)
+        output = output.strip()
+        LLM_CACHE.put(key, output, agent=agent_name)
+        tracing.annotate(response_bytes=len(output.encode("utf-8")))
+        return output
 
     except FileNotFoundError as e:
         print(f"\n   ❌ CLI tool not found: {e.filename}")
@@ -253,14 +594,347 @@ TASK:
             print(f"   - Augment CLI: Check Augment documentation")
         if "gemini" in str(e.filename):
             print(f"   - Gemini CLI: pip install google-generativeai")
-        sys.exit(1)
+        raise AgentCallError(f"CLI tool not found: {e.filename}") from e
 
-    except subprocess.TimeoutExpired:
-        print(f"\n   ❌ {agent_name} timed out after 5 minutes")
-        sys.exit(1)
+    except subprocess.TimeoutExpired as e:
+        print(f"\n   ❌ {agent_name} timed out after {backend.timeout // 60} minutes")
+        raise AgentCallError(f"{agent_name} timed out") from e
+
+    except OSError as e:
+        print(f"\n   ❌ {agent_name} {backend.kind} backend unavailable: {e}")
+        raise AgentCallError(f"{agent_name} {backend.kind} backend unavailable: {e}") from e
+
+
+def pool_results(pool, futures):
+    """
+    The results of futures, in order. On the first failure the calls still
+    queued in pool are cancelled and the error is re-raised, instead of
+    every remaining call running before it surfaces.
+    """
+    try:
+        for future in as_completed(futures):
+            future.result()
+    except BaseException:
+        pool.shutdown(wait=False, cancel_futures=True)
+        raise
+    return [future.result() for future in futures]
+
+
+def estimated_code_tokens(entries):
+    """Rough token count of every file the scan would include, from the index sizes."""
+    return sum(e["size"] for e in entries if e["lines"] < MAX_SCAN_LINES) // CHARS_PER_TOKEN
+
+
+def chunk_code_sections(entries, chunk_tokens=ARCHAEOLOGY_CHUNK_TOKENS):
+    """
+    Stream the scanned files as (category, part, sections) chunks of up to
+    chunk_tokens each. A chunk never mixes SCAN_DIRS categories; a single
+    file larger than chunk_tokens gets a chunk of its own.
+    """
+    category, part, chunk, used = None, 0, [], 0
+    for entry, section in iter_code_sections(entries):
+        if chunk and (entry["category"] != category or used + section["tokens"] > chunk_tokens):
+            yield category, part, chunk
+            chunk, used = [], 0
+        if entry["category"] != category:
+            category, part = entry["category"], 0
+        if not chunk:
+            part += 1
+        chunk.append(section)
+        used += section["tokens"]
+    if chunk:
+        yield category, part, chunk
+
+
+def summarize_code_chunk(category, part, sections):
+    """Map step: an agent-written inventory of one chunk of existing code."""
+    summary = run_agent_command(
+        agent_name="Auggie",
+        system_role="Infrastructure Surveyor",
+        prompt=ARCHAEOLOGY_MAP_PROMPT.format(category=category),
+        context_content=sections
+    )
+    return make_section("EXISTING CODE SUMMARIES", f"\n## {category} (part {part})\n{summary}\n",
+                        PRIORITY_CODE, title=f"{category} part {part}")
+
+
+def merge_summaries(group):
+    """Intermediate reduce step: merge several summaries into one."""
+    merged = run_agent_command(
+        agent_name="Auggie",
+        system_role="Infrastructure Surveyor",
+        prompt=ARCHAEOLOGY_MERGE_PROMPT,
+        context_content=group
+    )
+    titles = ", ".join(s["title"] for s in group)
+    return make_section("EXISTING CODE SUMMARIES", f"\n## Merged: {titles}\n{merged}\n",
+                        PRIORITY_CODE, title=f"merged {titles}")
+
+
+@tracing.traced("map_reduce_archaeology")
+def map_reduce_archaeology(entries, brief_content, domain_contexts, workers=ARCHAEOLOGY_WORKERS):
+    """
+    Infrastructure analysis for codebases larger than one context window.
+
+    Map: every scanned file, chunked per SCAN_DIRS category, is summarized
+    by up to `workers` agent calls at a time. Reduce: while the summaries
+    don't fit next to the Brief and domain contexts, they are merged in
+    groups (also in parallel); then one Archaeologist call turns them into
+    the analysis. Latency grows with the number of rounds, not files.
+
+    Returns:
+        The infrastructure analysis markdown.
+    """
+    brief_section = make_section("BRIEF", brief_content, PRIORITY_BRIEF)
+    budget = context_budget(CONTEXT_WINDOWS["Auggie"],
+                            ARCHAEOLOGY_PROMPT + brief_content + sections_text(domain_contexts))
+    chunk_tokens = min(ARCHAEOLOGY_CHUNK_TOKENS, budget)
+
+    with ThreadPoolExecutor(max_workers=max(1, workers)) as pool:
+        futures = [pool.submit(tracing.bind(summarize_code_chunk), category, part, sections)
+                   for category, part, sections in chunk_code_sections(entries, chunk_tokens)]
+        print(f"   🗺️  Map: summarizing {len(futures)} chunk(s), up to {min(workers, len(futures))} at a time")
+        summaries = pool_results(pool, futures)
+
+        rounds = 0
+        while len(summaries) > 1 and sum(s["tokens"] for s in summaries) > budget:
+            groups, group, used = [], [], 0
+            for summary in summaries:
+                if group and used + summary["tokens"] > chunk_tokens:
+                    groups.append(group)
+                    group, used = [], 0
+                group.append(summary)
+                used += summary["tokens"]
+            groups.append(group)
+            if len(groups) == len(summaries):
+                break  # every summary is already chunk-sized; let the packer drop what won't fit
+            rounds += 1
+            print(f"   🧮 Reduce round {rounds}: merging {len(summaries)} summaries into {len(groups)}")
+            merged = iter(pool_results(pool, [pool.submit(tracing.bind(merge_summaries), group)
+                                              for group in groups if len(group) > 1]))
+            summaries = [next(merged) if len(group) > 1 else group[0] for group in groups]
+
+    tracing.annotate(summaries=len(summaries), reduce_rounds=rounds)
+    return run_agent_command(
+        agent_name="Auggie",
+        system_role="Infrastructure Archaeologist",
+        prompt=ARCHAEOLOGY_PROMPT + "\n\nThe existing code is given as summaries of every scanned file, grouped by category.",
+        context_content=[*domain_contexts, brief_section, *summaries]
+    )
+
+
+HTTP_METHODS = ("get", "post", "put", "patch", "delete", "head", "options")
+FIXTURE_PROMPT = ("Read the API Contract excerpt for {endpoint}. Generate realistic mock data (JSON) for this "
+                  "endpoint: example requests and responses, including edge cases and error responses. "
+                  "Output ONLY valid JSON.")
+# A contract that cannot be split into endpoints goes out whole, with the original prompt
+WHOLE_CONTRACT = "API"
+FIXTURE_CONTRACT_PROMPT = ("Read the API Contract. Generate realistic mock data (JSON) for every endpoint. "
+                           "Include edge cases. Output ONLY valid JSON.")
+
+
+def parse_json_output(text):
+    """Parse an agent's JSON output, tolerating a surrounding ``` fence or prose."""
+    text = (text or "").strip()
+    if text.startswith("```"):
+        text = text.split("\n", 1)[1] if "\n" in text else ""
+        text = text.rsplit("```", 1)[0]
+    try:
+        return json.loads(text)
+    except json.JSONDecodeError:
+        starts = [i for i in (text.find("{"), text.find("[")) if i >= 0]
+        if not starts:
+            raise
+        return json.JSONDecoder().raw_decode(text[min(starts):])[0]
+
+
+def resolve_refs(contract, node):
+    """Every "$ref": "#/..." target reachable from node, as {ref: value}."""
+    found = {}
+    stack = [node]
+    while stack:
+        item = stack.pop()
+        if isinstance(item, dict):
+            ref = item.get("$ref")
+            if isinstance(ref, str) and ref.startswith("#/") and ref not in found:
+                target = contract
+                for part in ref[2:].split("/"):
+                    target = target.get(part.replace("~1", "/").replace("~0", "~")) if isinstance(target, dict) else None
+                found[ref] = target
+                stack.append(target)
+            stack.extend(item.values())
+        elif isinstance(item, list):
+            stack.extend(item)
+    return found
+
+
+def split_api_contract(api_content):
+    """
+    Split the API contract into one excerpt per endpoint for fixture generation.
+
+    Understands OpenAPI-style "paths", a list of endpoint objects (with
+    "path"/"endpoint"/"url" and "method"), and maps keyed "METHOD /path".
+    Each excerpt carries the $ref targets its endpoint uses and the
+    contract's small top-level entries (base URL, auth, ...).
+
+    Returns:
+        A list of (endpoint name, excerpt JSON), or a single (WHOLE_CONTRACT, whole
+        contract) entry if the contract can't be split.
+    """
+    try:
+        contract = parse_json_output(api_content)
+    except (json.JSONDecodeError, ValueError):
+        return [(WHOLE_CONTRACT, api_content)]
+
+    endpoints = []
+    container = None
+    if isinstance(contract, dict) and isinstance(contract.get("paths"), dict):
+        container = "paths"
+        for path, item in contract["paths"].items():
+            if not isinstance(item, dict):
+                continue
+            shared_params = item.get("parameters")
+            for method, operation in item.items():
+                if method.lower() in HTTP_METHODS:
+                    spec = {"method": method.upper(), "path": path, "operation": operation}
+                    if shared_params:
+                        spec["path_parameters"] = shared_params
+                    endpoints.append((f"{method.upper()} {path}", spec))
+    else:
+        candidates = [(None, contract)]
+        if isinstance(contract, dict):
+            candidates += list(contract.items())
+        for key, value in candidates:
+            if isinstance(value, list):
+                items = [(None, v) for v in value if isinstance(v, dict)]
+            elif isinstance(value, dict):
+                items = [(k, v) for k, v in value.items()
+                         if isinstance(v, dict) and k.split(" ", 1)[0].lower() in HTTP_METHODS]
+            else:
+                continue
+            named = []
+            for name, spec in items:
+                path = spec.get("path") or spec.get("endpoint") or spec.get("url") or spec.get("route")
+                if name is None and path is None:
+                    continue
+                method = str(spec.get("method", "")).upper()
+                named.append((name or f"{method} {path}".strip(), spec))
+            if named:
+                container = key
+                endpoints = named
+                break
+
+    if len(endpoints) < 2:
+        return [(WHOLE_CONTRACT, api_content)]
+
+    shared = {}
+    if isinstance(contract, dict):
+        endpoint_keys = {name for name, _ in endpoints} if container is None else {container}
+        shared = {k: v for k, v in contract.items()
+                  if k not in endpoint_keys and k not in ("components", "definitions")
+                  and len(json.dumps(v)) <= FIXTURE_SHARED_MAX_CHARS}
+
+    # Endpoint names must be unique keys in the merged fixtures
+    counts = {}
+    shards = []
+    for name, spec in endpoints:
+        counts[name] = counts.get(name, 0) + 1
+        if counts[name] > 1:
+            name = f"{name} #{counts[name]}"
+        excerpt = {**({"shared": shared} if shared else {}), "endpoint": spec}
+        refs = resolve_refs(contract, spec)
+        if refs:
+            excerpt["referenced_definitions"] = refs
+        shards.append((name, json.dumps(excerpt, indent=2)))
+    return shards
+
+
+def generate_endpoint_fixtures(endpoint, excerpt):
+    """
+    Ask Gemini for one endpoint's fixtures (or, for WHOLE_CONTRACT, every
+    endpoint's), with one repair attempt if the output is not valid JSON.
+
+    Returns:
+        (parsed fixtures, None) or (None, error message)
+    """
+    if endpoint == WHOLE_CONTRACT:
+        prompt, section = FIXTURE_CONTRACT_PROMPT, make_section("API CONTRACT", excerpt, PRIORITY_SPEC)
+    else:
+        prompt = FIXTURE_PROMPT.format(endpoint=endpoint)
+        section = make_section(f"API CONTRACT: {endpoint}", excerpt, PRIORITY_SPEC)
+
+    output = run_agent_command(
+        agent_name="Gemini",
+        system_role="Data Specialist",
+        prompt=prompt,
+        context_content=[section]
+    )
+    try:
+        return parse_json_output(output), None
+    except (json.JSONDecodeError, ValueError) as e:
+        print(f"   ⚠️  {endpoint}: fixtures are not valid JSON ({e}), asking again")
+        error = e
+
+    output = run_agent_command(
+        agent_name="Gemini",
+        system_role="Data Specialist",
+        prompt=(prompt +
+                f"\n\nYour previous answer was not valid JSON ({error}). Output ONLY the JSON document."),
+        context_content=[section]
+    )
+    try:
+        return parse_json_output(output), None
+    except (json.JSONDecodeError, ValueError) as e:
+        return None, str(e)
+
+
+def generate_fixtures(api_content, workers=FIXTURE_WORKERS):
+    """
+    Generate fixtures for every endpoint of the API contract, up to
+    `workers` endpoints at a time, and merge them into one JSON document
+    keyed by endpoint.
+
+    Returns:
+        (fixtures JSON text, list of endpoints that failed)
+    """
+    shards = split_api_contract(api_content)
+    print(f"  🧩 {len(shards)} endpoint shard(s), up to {min(workers, len(shards))} at a time")
+
+    results = {}
+    with ThreadPoolExecutor(max_workers=max(1, workers)) as pool:
+        futures = [pool.submit(tracing.bind(generate_endpoint_fixtures), name, excerpt) for name, excerpt in shards]
+        for (name, _), result in zip(shards, pool_results(pool, futures)):
+            results[name] = result
+
+    failed = [f"{name}: {error}" for name, (_, error) in results.items() if error]
+    if len(shards) == 1 and shards[0][0] == WHOLE_CONTRACT:
+        fixtures = results[WHOLE_CONTRACT][0]  # unsplit contract: keep the agent's own layout
+    else:
+        fixtures = {name: data for name, (data, error) in results.items() if not error}
+    return json.dumps(fixtures, indent=2), failed
 
 
 def main():
+    parser = argparse.ArgumentParser(description="Zero Ambiguity Council Orchestrator")
+    parser.add_argument("--no-cache", action="store_true", help="Bypass the LLM response cache")
+    parser.add_argument("--refresh", action="store_true",
+                        help="Ignore cached LLM responses but store fresh ones")
+    parser.add_argument("--force", action="store_true",
+                        help="Rebuild every phase regardless of the build manifest")
+    parser.add_argument("--profile", action="store_true",
+                        help="Record a timing trace and print a profile summary at exit")
+    parser.add_argument("--archaeology", choices=ARCHAEOLOGY_MODES, default="auto",
+                        help="Phase 0: one Archaeologist prompt, per-category map-reduce, or map-reduce "
+                             "only when the code doesn't fit the window (default: auto)")
+    parser.add_argument("--archaeology-workers", type=int, default=ARCHAEOLOGY_WORKERS, metavar="N",
+                        help=f"Code chunks to summarize at once in map-reduce archaeology (default: {ARCHAEOLOGY_WORKERS})")
+    parser.add_argument("--fixture-workers", type=int, default=FIXTURE_WORKERS, metavar="N",
+                        help=f"API endpoints to generate fixtures for at once (default: {FIXTURE_WORKERS})")
+    args = parser.parse_args()
+    LLM_CACHE.mode = mode_from_flags(args.no_cache, args.refresh)
+    if args.profile:
+        print(f"⏱️  Tracing to {tracing.start('orchestrator')}")
+
     print("=" * 60)
     print("🏛️  THE COUNCIL IS NOW IN SESSION")
     print("=" * 60)
@@ -278,62 +952,57 @@ def main():
         sys.exit(1)
 
     print("\n✅ Strategic Brief found.")
+    manifest = load_manifest()
 
     # --- LOAD DOMAIN CONTEXTS ---
     print("\n📚 Loading Domain Contexts...")
     domain_contexts = load_domain_contexts(brief_content)
     if domain_contexts:
-        print(f"   ✅ Domain contexts loaded ({len(domain_contexts)} chars)")
+        print(f"   ✅ Domain contexts loaded (~{estimate_tokens(sections_text(domain_contexts))} tokens)")
     else:
         print("   ℹ️  No applicable domain contexts found")
 
     # --- PHASE 0: ARCHAEOLOGY (Infrastructure Discovery) ---
+    phase = tracing.begin("phase_0_archaeology", "phase")
     print("\n" + "-" * 60)
     print("PHASE 0: THE ARCHAEOLOGIST (Infrastructure Discovery)")
     print("-" * 60)
 
-    if not os.path.exists(FILES["INFRA"]):
-        # Scan for existing code files
-        existing_code = scan_existing_infrastructure()
-
-        if existing_code:
-            print(f"\n   📁 Found existing code in {len(existing_code)} locations")
+    # Index existing code files (only changed files are re-read)
+    infra_index = index_existing_infrastructure()
+    infra_inputs = {
+        "brief": brief_content,
+        "domain_contexts": sections_text(domain_contexts),
+        "existing_code": infrastructure_digest(infra_index),
+    }
+
+    reason = needs_rebuild(manifest, "INFRA", infra_inputs, args.force)
+    if reason:
+        print(f"  🔨 Building infrastructure analysis ({reason})")
+        scan_budget = context_budget(CONTEXT_WINDOWS["Auggie"])
+        map_reduce = args.archaeology == "map-reduce" or (
+            args.archaeology == "auto" and estimated_code_tokens(infra_index) > scan_budget)
+
+        existing_code = None if map_reduce else scan_existing_infrastructure(infra_index, scan_budget)
+        if map_reduce and estimated_code_tokens(infra_index):
+            print(f"\n   🗺️  Map-reduce archaeology (~{estimated_code_tokens(infra_index)} tokens of code)")
+            infra_analysis = map_reduce_archaeology(infra_index, brief_content, domain_contexts,
+                                                    args.archaeology_workers)
+            save_file(FILES["INFRA"], infra_analysis)
+        elif existing_code:
+            print(f"\n   📁 Found existing code in {len(existing_code)} files")
 
             # Build context with domain contexts if available
-            archaeology_context = f"--- BRIEF ---\n{brief_content}\n\n--- EXISTING CODE ---\n{existing_code}"
-            if domain_contexts:
-                archaeology_context = f"--- DOMAIN CONTEXTS (Business Intent + Code Navigation) ---\n{domain_contexts}\n\n{archaeology_context}"
+            archaeology_context = [
+                *domain_contexts,
+                make_section("BRIEF", brief_content, PRIORITY_BRIEF),
+                *existing_code,
+            ]
 
             infra_analysis = run_agent_command(
                 agent_name="Auggie",
                 system_role="Infrastructure Archaeologist",
-                prompt="""Analyze the existing infrastructure and the Brief.
-
-IMPORTANT: If Domain Contexts are provided, use them to understand:
-1. Business rules and intent (WHY things work the way they do)
-2. Code navigation (WHERE to find related files and HOW they connect)
-
-Your task:
-1. Identify which existing tables/models are relevant to this feature
-2. Identify which existing API endpoints can be reused
-3. Identify what is NET NEW (must be created)
-4. Flag potential conflicts or constraints
-
-Output a structured analysis following this format:
-
-## Existing Infrastructure to REUSE
-[List tables, endpoints, models that already exist and should NOT be recreated]
-
-## Existing Infrastructure to EXTEND
-[List what needs modification - e.g., "Add 'status' column to events table"]
-
-## Net New Infrastructure
-[List what must be created from scratch]
-
-## Constraints & Warnings
-[List any conflicts, dependencies, or things to avoid]
-
-Be specific. Reference actual table names, column names, and file paths from the existing code.""",
+                prompt=ARCHAEOLOGY_PROMPT,
                 context_content=archaeology_context
             )
             save_file(FILES["INFRA"], infra_analysis)
@@ -341,23 +1010,32 @@ Be specific. Reference actual table names, column names, and file paths from the
             print("   ℹ️  No existing infrastructure found. This appears to be a greenfield project.")
             # Create a minimal infra file indicating greenfield
             save_file(FILES["INFRA"], "# Existing Infrastructure Analysis\n\n**Status:** Greenfield project - no existing infrastructure detected.\n\nAll specs will be net-new.")
+        record_build(manifest, "INFRA", infra_inputs)
     else:
-        print("  ⏩ Infrastructure analysis already exists. Skipping.")
+        print("  ⏩ Infrastructure analysis is up to date. Skipping.")
+
+    tracing.end(phase, artifact="INFRA", rebuilt=bool(reason))
 
     # Load infrastructure for subsequent phases
     infra_content = read_file(FILES["INFRA"])
 
     # --- PHASE A: DATA ARCHITECTURE (Auggie) ---
+    phase = tracing.begin("phase_a_schema", "phase")
     print("\n" + "-" * 60)
     print("PHASE A: THE VAULT MASTER (Database Schema)")
     print("-" * 60)
 
     # Build base context for all phases
-    base_context = f"--- BRIEF ---\n{brief_content}\n\n--- EXISTING INFRASTRUCTURE ---\n{infra_content}"
-    if domain_contexts:
-        base_context = f"--- DOMAIN CONTEXTS (Business Intent + Code Navigation) ---\n{domain_contexts}\n\n{base_context}"
-
-    if not os.path.exists(FILES["SCHEMA"]):
+    base_context = [
+        *domain_contexts,
+        make_section("BRIEF", brief_content, PRIORITY_BRIEF),
+        make_section("EXISTING INFRASTRUCTURE", infra_content, PRIORITY_SPEC),
+    ]
+
+    schema_inputs = {"brief": brief_content, "domain_contexts": sections_text(domain_contexts), "infra": infra_content}
+    reason = needs_rebuild(manifest, "SCHEMA", schema_inputs, args.force)
+    if reason:
+        print(f"  🔨 Building schema ({reason})")
         schema_sql = run_agent_command(
             agent_name="Auggie",
             system_role="Database Architect",
@@ -378,16 +1056,23 @@ Output ONLY valid SQL. No markdown, no explanations.""",
             context_content=base_context
         )
         save_file(FILES["SCHEMA"], schema_sql)
+        record_build(manifest, "SCHEMA", schema_inputs)
     else:
-        print("  ⏩ Schema already exists. Skipping.")
+        print("  ⏩ Schema is up to date. Skipping.")
+
+    tracing.end(phase, artifact="SCHEMA", rebuilt=bool(reason))
 
     # --- PHASE B: API ARCHITECTURE (Auggie) ---
+    phase = tracing.begin("phase_b_api", "phase")
     print("\n" + "-" * 60)
     print("PHASE B: THE GATEKEEPER (API Contract)")
     print("-" * 60)
 
-    if not os.path.exists(FILES["API"]):
-        schema_content = read_file(FILES["SCHEMA"])
+    schema_content = read_file(FILES["SCHEMA"])
+    api_inputs = {**schema_inputs, "schema": schema_content}
+    reason = needs_rebuild(manifest, "API", api_inputs, args.force)
+    if reason:
+        print(f"  🔨 Building API contract ({reason})")
         api_json = run_agent_command(
             agent_name="Auggie",
             system_role="API Architect",
@@ -406,38 +1091,57 @@ CRITICAL RULES:
 5. Follow naming and structure conventions from existing API
 
 Output ONLY valid JSON.""",
-            context_content=f"{base_context}\n\n--- SCHEMA ---\n{schema_content}"
+            context_content=[*base_context, make_section("SCHEMA", schema_content, PRIORITY_SPEC)]
         )
         save_file(FILES["API"], api_json)
+        record_build(manifest, "API", api_inputs)
     else:
-        print("  ⏩ API Contract already exists. Skipping.")
+        print("  ⏩ API Contract is up to date. Skipping.")
+
+    tracing.end(phase, artifact="API", rebuilt=bool(reason))
 
     # --- PHASE C: EVIDENCE GENERATION (Gemini) ---
+    phase = tracing.begin("phase_c_fixtures", "phase")
     print("\n" + "-" * 60)
     print("PHASE C: THE WITNESS (Data Fixtures)")
     print("-" * 60)
     
-    if not os.path.exists(FILES["FIXTURES"]):
-        api_content = read_file(FILES["API"])
-        fixtures_json = run_agent_command(
-            agent_name="Gemini",
-            system_role="Data Specialist",
-            prompt="Read the API Contract. Generate realistic mock data (JSON) for every endpoint. Include edge cases. Output ONLY valid JSON.",
-            context_content=f"--- API CONTRACT ---\n{api_content}"
-        )
+    api_content = read_file(FILES["API"])
+    fixtures_inputs = {"api": api_content}
+    reason = needs_rebuild(manifest, "FIXTURES", fixtures_inputs, args.force)
+    if reason:
+        print(f"  🔨 Building fixtures ({reason})")
+        fixtures_json, failed = generate_fixtures(api_content, args.fixture_workers)
+        if failed:
+            print(f"\n❌ No valid fixtures for {len(failed)} endpoint(s):")
+            for line in failed:
+                print(f"   - {line}")
+            print("   Fix the API contract, or rerun with --refresh to ask again (valid endpoints stay cached).")
+            sys.exit(1)
         save_file(FILES["FIXTURES"], fixtures_json)
+        record_build(manifest, "FIXTURES", fixtures_inputs)
     else:
-        print("  ⏩ Fixtures already exist. Skipping.")
+        print("  ⏩ Fixtures are up to date. Skipping.")
+
+    tracing.end(phase, artifact="FIXTURES", rebuilt=bool(reason))
 
     # --- PHASE D: IMPLEMENTATION PLANNING (Auggie) ---
+    phase = tracing.begin("phase_d_plan", "phase")
     print("\n" + "-" * 60)
     print("PHASE D: THE FOREMAN (Implementation Plan)")
     print("-" * 60)
 
-    if not os.path.exists(FILES["PLAN"]):
-        schema_content = read_file(FILES["SCHEMA"])
-        api_content = read_file(FILES["API"])
-        fixtures_content = read_file(FILES["FIXTURES"])
+    fixtures_content = read_file(FILES["FIXTURES"])
+    plan_inputs = {
+        "brief": brief_content,
+        "infra": infra_content,
+        "schema": schema_content,
+        "api": api_content,
+        "fixtures": fixtures_content,
+    }
+    reason = needs_rebuild(manifest, "PLAN", plan_inputs, args.force)
+    if reason:
+        print(f"  🔨 Building implementation plan ({reason})")
 
         plan_md = run_agent_command(
             agent_name="Auggie",
@@ -450,32 +1154,42 @@ CRITICAL RULES:
 3. Sequence: DB → API → UI
 4. Each ticket must reference a specific spec file
 5. Mark which tickets touch existing code vs. new code
+6. Give every ticket a "**Depends on:**" line listing the ticket numbers it
+   needs first (e.g. "**Depends on:** 1, 3"), or "None"
 
-Output a structured implementation plan.""",
-            context_content=f"""
---- BRIEF ---
-{brief_content}
-
---- EXISTING INFRASTRUCTURE ---
-{infra_content}
+Format each ticket as:
+## Ticket N: [Title]
+**Priority:** [High/Medium/Low]
+**Type:** [Migration/Model/Controller/Route/Component/etc.]
+**Depends on:** [Ticket numbers or None]
+**File:** `path/to/file`
 
---- SCHEMA ---
-{schema_content}
+**Description:**
+[Description]
 
---- API CONTRACT ---
-{api_content}
+**Acceptance Criteria:**
+- [ ] Criterion
 
---- FIXTURES ---
-{fixtures_content}
-"""
+Output a structured implementation plan.""",
+            context_content=[
+                make_section("BRIEF", brief_content, PRIORITY_BRIEF),
+                make_section("EXISTING INFRASTRUCTURE", infra_content, PRIORITY_SPEC),
+                make_section("SCHEMA", schema_content, PRIORITY_SPEC),
+                make_section("API CONTRACT", api_content, PRIORITY_SPEC),
+                make_section("FIXTURES", fixtures_content, PRIORITY_SPEC),
+            ]
         )
         save_file(FILES["PLAN"], plan_md)
+        record_build(manifest, "PLAN", plan_inputs)
     else:
-        print("  ⏩ Plan already exists. Skipping.")
+        print("  ⏩ Plan is up to date. Skipping.")
+
+    tracing.end(phase, artifact="PLAN", rebuilt=bool(reason))
 
     print("\n" + "=" * 60)
     print("✅ COUNCIL SESSION ADJOURNED")
     print("=" * 60)
+    print(f"\n💾 {LLM_CACHE.summary()}")
     print(f"\nArtifacts generated in: {DIRS['SPECS']}/")
     print("\nReady for Execution Phase (State 4).")
     print("To execute the plan with sub-agents:")
@@ -485,5 +1199,8 @@ Output a structured implementation plan.""",
 
 
 if __name__ == "__main__":
-    main()
+    try:
+        main()
+    except AgentCallError:
+        sys.exit(1)
 
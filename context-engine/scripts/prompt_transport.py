@@ -0,0 +1,58 @@
+#!/usr/bin/env python3
+"""
+Zero Ambiguity Prompt Transport
+
+Builds agent CLI invocations for a prompt without necessarily putting the
+prompt in the argument vector. A single argv string is capped by the
+kernel (128 KiB on Linux, E2BIG beyond that), is visible to anyone
+running `ps`, and is copied on every exec, so large prompts should travel
+another way.
+
+Transports (set per agent):
+    argv   - substitute "{prompt}" in the command template (legacy)
+    stdin  - write the prompt to the CLI's standard input
+    file   - write the prompt to a private temp file and substitute its
+             path for "{prompt_file}"; the file is removed afterwards
+"""
+
+import os
+import tempfile
+from contextlib import contextmanager
+
+TRANSPORTS = ("argv", "stdin", "file")
+
+
+@contextmanager
+def prompt_invocation(cmd_template: list[str], prompt: str, transport: str = "argv"):
+    """
+    Prepare a CLI invocation that delivers prompt via the given transport.
+
+    Args:
+        cmd_template: Command with optional "{prompt}" / "{prompt_file}" placeholders
+        prompt: The full prompt text
+        transport: One of TRANSPORTS
+
+    Yields:
+        (cmd, stdin_text) - stdin_text is None unless the transport is "stdin".
+    """
+    if transport not in TRANSPORTS:
+        raise ValueError(f"Unknown prompt transport: {transport}. Supported: {list(TRANSPORTS)}")
+
+    if transport == "argv":
+        yield [c.replace("{prompt}", prompt) for c in cmd_template], None
+        return
+
+    if transport == "stdin":
+        yield list(cmd_template), prompt
+        return
+
+    fd, path = tempfile.mkstemp(prefix="prompt-", suffix=".md")  # created with mode 0600
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            f.write(prompt)
+        yield [c.replace("{prompt_file}", path) for c in cmd_template], None
+    finally:
+        try:
+            os.unlink(path)
+        except FileNotFoundError:
+            pass
@@ -0,0 +1,110 @@
+#!/usr/bin/env python3
+"""
+Zero Ambiguity Retrieval
+
+Local BM25 ranking over markdown sections, used to pick the domain-context
+and standards sections that are relevant to a Brief or a ticket instead of
+attaching every file to every prompt.
+
+Documents are split into chunks at "#", "##" and "###" headings; each chunk
+keeps its source file and heading so it can be rendered on its own.
+"""
+
+import math
+import re
+from collections import Counter
+
+TOKEN_RE = re.compile(r"[a-z0-9]+")
+HEADING_RE = re.compile(r"^(#{1,3})\s+(.+?)\s*$")
+
+# Common English and markdown-template words that carry no topical signal
+STOPWORDS = frozenset("""
+a an and are as at be by can do does for from has have how if in into is it its
+not of on or should that the their then there these this to was we what when
+where which who why will with you your must use used using file files see also
+""".split())
+
+
+def tokenize(text: str) -> list[str]:
+    """Lowercase word tokens without stopwords or single characters."""
+    return [t for t in TOKEN_RE.findall(text.lower()) if len(t) > 1 and t not in STOPWORDS]
+
+
+def split_markdown_sections(text: str, source: str) -> list[dict]:
+    """
+    Split a markdown document into heading-delimited chunks.
+
+    Text before the first heading becomes its own chunk titled after the
+    source. "#" lines inside code fences are not headings. Chunks with no
+    content beyond the heading are dropped.
+
+    Returns:
+        A list of {"source", "heading", "text"} dicts in document order.
+    """
+    chunks = []
+    heading, heading_line, body = source, None, []
+
+    def flush():
+        if tokenize("\n".join(body)):
+            text = "\n".join(([heading_line] if heading_line else []) + body).strip()
+            chunks.append({"source": source, "heading": heading, "text": text})
+
+    in_fence = False
+    for line in text.splitlines():
+        if line.lstrip().startswith("```"):
+            in_fence = not in_fence
+        match = None if in_fence else HEADING_RE.match(line)
+        if match:
+            flush()
+            heading, heading_line, body = match.group(2), line, []
+        else:
+            body.append(line)
+    flush()
+    return chunks
+
+
+class BM25Index:
+    """
+    Okapi BM25 over a fixed list of chunks.
+
+    Term frequencies are kept in an inverted index (term -> postings), so a
+    query only touches the chunks that contain at least one of its terms.
+    """
+
+    def __init__(self, chunks: list[dict], k1: float = 1.5, b: float = 0.75):
+        self.chunks = chunks
+        self.k1 = k1
+        self.b = b
+        self.postings = {}  # term -> [(chunk index, term frequency)]
+        self.lengths = []
+        for i, chunk in enumerate(chunks):
+            tf = Counter(tokenize(f"{chunk['heading']} {chunk['text']}"))
+            self.lengths.append(sum(tf.values()))
+            for term, freq in tf.items():
+                self.postings.setdefault(term, []).append((i, freq))
+        self.avg_length = (sum(self.lengths) / len(self.lengths)) if chunks else 0.0
+        n = len(chunks)
+        self.idf = {term: math.log(1 + (n - len(p) + 0.5) / (len(p) + 0.5)) for term, p in self.postings.items()}
+
+    def scores(self, query: str) -> dict[int, float]:
+        """BM25 score of every chunk that shares a term with the query, by chunk index."""
+        results = {}
+        for term, query_count in Counter(tokenize(query)).items():
+            for i, freq in self.postings.get(term, ()):
+                norm = self.k1 * (1 - self.b + self.b * self.lengths[i] / self.avg_length)
+                results[i] = results.get(i, 0.0) + query_count * self.idf[term] * freq * (self.k1 + 1) / (freq + norm)
+        return results
+
+    def search(self, query: str, top_k: int | None = None) -> list[tuple[float, dict]]:
+        """
+        Rank chunks against the query.
+
+        Returns:
+            (score, chunk) pairs with a positive score, best first; ties keep
+            document order.
+        """
+        ranked = [(score, i) for i, score in self.scores(query).items() if score > 0]
+        ranked.sort(key=lambda pair: (-pair[0], pair[1]))
+        if top_k is not None:
+            ranked = ranked[:top_k]
+        return [(score, self.chunks[i]) for score, i in ranked]
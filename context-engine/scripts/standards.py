@@ -12,6 +12,18 @@ Usage:
     python scripts/standards.py genesis <tech_stack>
     python scripts/standards.py freeze <component_name>
 
+Options (any mode):
+    --refresh     Ignore cached LLM responses but store fresh ones
+    --no-cache    Bypass the LLM response cache entirely
+    --profile     Record a timing trace and print a profile summary at exit
+    --workers N   Prompts to run at once in audit mode (default: 4)
+    --batch-tokens N
+                  Audit small files together, up to N tokens of code per
+                  prompt (default: 8000; 0 sends each file on its own)
+
+Audit results are kept per file in context-engine/.cache/audit-ledger.json;
+rerunning an audit only sends new or changed files to the LLM.
+
 See guides/standards-workflow.md for detailed explanation.
 """
 
@@ -19,6 +31,15 @@ import os
 import sys
 import subprocess
 import glob
+import hashlib
+import json
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from datetime import datetime
+
+from agent_backends import AgentCallError, AgentRegistry, agent_configs
+from context_packer import estimate_tokens
+from llm_cache import LLMCache, cache_key, mode_from_flags
+import tracing
 
 # --- CONFIGURATION ---
 STANDARDS_DIR = "context-engine/standards"
@@ -28,6 +49,50 @@ STANDARDS_FILES = {
     "genesis": os.path.join(STANDARDS_DIR, "reference-implementations.md")
 }
 
+# Agents not in DEFAULT_AGENTS get the prompt as an argument: [agent, "-p", prompt]
+AGENTS = agent_configs()
+AGENT_BACKENDS = AgentRegistry(AGENTS)
+
+# Shared LLM response cache (mode is set from the command line in main)
+LLM_CACHE = LLMCache(os.path.join("context-engine", ".cache", "llm"))
+CACHE_FLAGS = ("--no-cache", "--refresh")
+OPTION_FLAGS = (*CACHE_FLAGS, "--profile")
+
+# Audit: files analyzed at once (--workers N), and the per-file ledger of
+# content hashes and extracted entries that lets unchanged files skip the LLM
+AUDIT_WORKERS = 4
+AUDIT_LEDGER = os.path.join("context-engine", ".cache", "audit-ledger.json")
+AUDIT_PROMPT = """
+Analyze this code file and extract reusable patterns.
+
+File: {filepath}
+
+TASK:
+1. Identify any reusable components, functions, or patterns
+2. Document the public API (props, parameters, return types)
+3. Write a concise documentation entry in markdown format
+
+Output ONLY the documentation entry, no explanations.
+"""
+
+# Small files are bin-packed into one prompt of up to AUDIT_BATCH_TOKENS of
+# code (--batch-tokens N, 0 to disable); files over AUDIT_BATCH_MAX_FILE_TOKENS
+# always get a prompt of their own.
+AUDIT_BATCH_TOKENS = 8000
+AUDIT_BATCH_MAX_FILE_TOKENS = 2000
+AUDIT_BATCH_PROMPT = """
+Analyze each of the code files below and extract reusable patterns.
+
+For EVERY file:
+1. Identify any reusable components, functions, or patterns
+2. Document the public API (props, parameters, return types)
+3. Write a concise documentation entry in markdown format
+
+Output one section per file, in the order given. Start each section with a line
+"## <file path>" using the path exactly as shown after "File:", then the entry.
+Output ONLY these sections, no explanations.
+"""
+
 
 def ensure_standards_dir():
     """Create standards directory if it doesn't exist."""
@@ -41,9 +106,10 @@ def ensure_standards_dir():
                 f.write("<!-- Auto-generated by standards.py -->\n\n")
 
 
+@tracing.traced("agent_call", "agent")
 def run_llm(agent_name, prompt, context=""):
     """
-    Call the LLM CLI tool.
+    Send a prompt to the agent's backend (see agent_backends.py).
     
     Args:
         agent_name: "auggie" or "gemini"
@@ -52,41 +118,68 @@ def run_llm(agent_name, prompt, context=""):
     
     Returns:
         The LLM's output
+    
+    Raises:
+        AgentCallError: the call failed (the reason has been printed)
     """
     full_prompt = f"{context}\n\n{prompt}" if context else prompt
     
+    if agent_name not in AGENT_BACKENDS:
+        AGENTS[agent_name] = {"backend": "cli", "cmd": [agent_name, "-p", "{prompt}"], "transport": "argv"}
+    backend = AGENT_BACKENDS.get(agent_name)
+    key = cache_key(agent_name, backend.identity, full_prompt)
+    cached = LLM_CACHE.get(key)
+    tracing.annotate(agent=agent_name, prompt_bytes=len(full_prompt.encode("utf-8")),
+                     cache="off" if LLM_CACHE.mode == "off" else ("hit" if cached is not None else "miss"))
+    if cached is not None:
+        print(f"   ⚡ Cache hit for {agent_name}")
+        tracing.annotate(response_bytes=len(cached.encode("utf-8")))
+        return cached
+    
     print(f"   🤖 Calling {agent_name}...")
     
     try:
-        process = subprocess.run(
-            [agent_name, "-p", full_prompt],
-            capture_output=True,
-            text=True,
-            timeout=300
-        )
+        returncode, output, stderr = backend.run(full_prompt)
         
-        if process.returncode != 0:
-            print(f"   ⚠️  {agent_name} returned error: {process.stderr}")
-            sys.exit(1)
+        if returncode != 0:
+            print(f"   ⚠️  {agent_name} returned error: {stderr}")
+            raise AgentCallError(f"{agent_name} returned error code {returncode}")
         
-        return process.stdout.strip()
+        output = output.strip()
+        LLM_CACHE.put(key, output, agent=agent_name)
+        tracing.annotate(response_bytes=len(output.encode("utf-8")))
+        return output
     
-    except FileNotFoundError:
+    except FileNotFoundError as e:
         print(f"   ❌ CLI tool '{agent_name}' not found in PATH")
-        sys.exit(1)
+        raise AgentCallError(f"CLI tool '{agent_name}' not found") from e
     
-    except subprocess.TimeoutExpired:
+    except subprocess.TimeoutExpired as e:
         print(f"   ❌ {agent_name} timed out")
-        sys.exit(1)
+        raise AgentCallError(f"{agent_name} timed out") from e
+    
+    except OSError as e:
+        print(f"   ❌ {agent_name} {backend.kind} backend unavailable: {e}")
+        raise AgentCallError(f"{agent_name} {backend.kind} backend unavailable: {e}") from e
 
 
-def audit_directory(target_dir, file_pattern="*"):
+@tracing.traced("audit", "phase")
+def audit_directory(target_dir, file_pattern="*", workers=AUDIT_WORKERS, batch_tokens=AUDIT_BATCH_TOKENS):
     """
     WORKFLOW A: Extract standards from existing code.
     
+    Files are analyzed by up to `workers` LLM calls at a time. Files whose
+    content is unchanged since the last audit (see AUDIT_LEDGER) reuse
+    their previous entry without an LLM call. Small files are analyzed in
+    batches of up to batch_tokens of code per prompt (see plan_audit_batches).
+    Rerunning an audit replaces that directory's block in the standards file
+    instead of appending.
+    
     Args:
         target_dir: Directory to audit
         file_pattern: Glob pattern for files (e.g., "*.blade.php", "*.py")
+        workers: Prompts to run concurrently
+        batch_tokens: Code per batched prompt (0 sends every file on its own)
     """
     print("=" * 60)
     print("🕵️  AUDIT MODE: Extracting Standards from Existing Code")
@@ -98,7 +191,7 @@ def audit_directory(target_dir, file_pattern="*"):
     
     # Find all matching files
     search_pattern = os.path.join(target_dir, "**", file_pattern)
-    files = glob.glob(search_pattern, recursive=True)
+    files = sorted(f for f in glob.glob(search_pattern, recursive=True) if os.path.isfile(f))
     
     if not files:
         print(f"❌ No files found matching pattern: {file_pattern}")
@@ -106,43 +199,206 @@ def audit_directory(target_dir, file_pattern="*"):
     
     print(f"\n📁 Found {len(files)} files to audit\n")
     
-    extracted_standards = []
+    ledger = load_audit_ledger()
+    version = audit_version()
+    entries = {}
+    changed = []
     
     for filepath in files:
-        print(f"   Analyzing: {filepath}")
-        
-        with open(filepath, 'r') as f:
+        with open(filepath, 'r', encoding='utf-8', errors='replace') as f:
             file_content = f.read()
-        
-        prompt = f"""
-Analyze this code file and extract reusable patterns.
+        digest = hashlib.sha256(file_content.encode("utf-8")).hexdigest()
+        previous = ledger.get(filepath)
+        if previous and previous["sha256"] == digest and previous["version"] == version:
+            entries[filepath] = previous["entry"]
+        else:
+            changed.append((filepath, file_content, digest))
+    
+    if entries:
+        print(f"   ♻️  {len(entries)} unchanged file(s) reuse their ledger entries")
+    batches = plan_audit_batches(changed, batch_tokens)
+    if changed:
+        print(f"   🤖 Analyzing {len(changed)} new or changed file(s) in {len(batches)} prompt(s), "
+              f"up to {min(workers, len(batches))} at a time\n")
+    digests = {filepath: digest for filepath, _, digest in changed}
+    
+    def record(results):
+        for filepath, entry in results.items():
+            entries[filepath] = entry
+            ledger[filepath] = {"sha256": digests[filepath], "version": version, "entry": entry,
+                                "audited_at": datetime.utcnow().isoformat() + "Z"}
+            print(f"   ✅ Analyzed: {filepath}")
+    
+    futures = []
+    recorded = set()
+    try:
+        with ThreadPoolExecutor(max_workers=max(1, workers)) as pool:
+            futures = [pool.submit(tracing.bind(audit_batch), batch) for batch in batches]
+            try:
+                for future in as_completed(futures):
+                    record(future.result())
+                    recorded.add(future)
+            except BaseException:
+                # Drop the queued prompts; the ones already running finish below
+                pool.shutdown(wait=False, cancel_futures=True)
+                raise
+    finally:
+        # Keep what was analyzed even if another prompt failed
+        for future in futures:
+            if future not in recorded and future.done() and not future.cancelled() and not future.exception():
+                record(future.result())
+        save_audit_ledger(ledger)
+    
+    extracted_standards = [f"\n## {os.path.basename(filepath)}\n\n{entries[filepath]}\n" for filepath in files]
+    
+    # Write to appropriate standards file
+    output_file = STANDARDS_FILES["ui"] if "component" in target_dir.lower() else STANDARDS_FILES["patterns"]
+    write_audit_block(output_file, target_dir, "".join(extracted_standards))
+    
+    tracing.annotate(files=len(files), reused=len(files) - len(changed), analyzed=len(changed), prompts=len(batches))
+    print(f"\n✅ Standards extracted and saved to: {output_file}")
 
-File: {filepath}
 
-TASK:
-1. Identify any reusable components, functions, or patterns
-2. Document the public API (props, parameters, return types)
-3. Write a concise documentation entry in markdown format
+def audit_file(filepath, file_content):
+    """Extract the standards entry for one file."""
+    prompt = AUDIT_PROMPT.format(filepath=filepath)
+    context = f"```\n{file_content}\n```"
+    return run_llm("auggie", prompt, context)
 
-Output ONLY the documentation entry, no explanations.
-"""
-        
-        context = f"```\n{file_content}\n```"
-        
-        result = run_llm("auggie", prompt, context)
-        extracted_standards.append(f"\n## {os.path.basename(filepath)}\n\n{result}\n")
+
+def plan_audit_batches(changed, batch_tokens=AUDIT_BATCH_TOKENS):
+    """
+    Group (filepath, content, digest) tuples into prompts: first-fit
+    decreasing bin-packing of files up to AUDIT_BATCH_MAX_FILE_TOKENS into
+    batches of at most batch_tokens; larger files go alone. Batches keep
+    path order inside.
     
-    # Append to appropriate standards file
-    output_file = STANDARDS_FILES["ui"] if "component" in target_dir.lower() else STANDARDS_FILES["patterns"]
+    Returns:
+        A list of batches, each a list of (filepath, content) pairs.
+    """
+    batches = []
+    loads = []
+    small = []
+    for filepath, file_content, _ in changed:
+        tokens = estimate_tokens(file_content)
+        if batch_tokens and tokens <= min(AUDIT_BATCH_MAX_FILE_TOKENS, batch_tokens):
+            small.append((tokens, filepath, file_content))
+        else:
+            batches.append([(filepath, file_content)])
+            loads.append(None)
+    
+    for tokens, filepath, file_content in sorted(small, key=lambda f: (-f[0], f[1])):
+        for i, load in enumerate(loads):
+            if load is not None and load + tokens <= batch_tokens:
+                batches[i].append((filepath, file_content))
+                loads[i] += tokens
+                break
+        else:
+            batches.append([(filepath, file_content)])
+            loads.append(tokens)
+    
+    return [sorted(batch) for batch in batches]
+
+
+def audit_batch(batch):
+    """
+    Extract the standards entries for a batch of files with one LLM call,
+    split back per file. Files the response has no section for are
+    audited on their own.
+    
+    Returns:
+        {filepath: entry}
+    """
+    if len(batch) == 1:
+        filepath, file_content = batch[0]
+        return {filepath: audit_file(filepath, file_content)}
     
-    with open(output_file, 'a') as f:
-        f.write("\n---\n")
-        f.write(f"<!-- Extracted from {target_dir} -->\n")
-        f.write("".join(extracted_standards))
+    context = "\n".join(f"### File: {filepath}\n```\n{file_content}\n```\n" for filepath, file_content in batch)
+    response = run_llm("auggie", AUDIT_BATCH_PROMPT, context)
+    entries = split_batch_response(response, [filepath for filepath, _ in batch])
     
-    print(f"\n✅ Standards extracted and saved to: {output_file}")
+    missing = [(filepath, file_content) for filepath, file_content in batch if not entries.get(filepath)]
+    if missing:
+        print(f"   ⚠️  Batch response had no section for {len(missing)} file(s); analyzing them one by one")
+    for filepath, file_content in missing:
+        entries[filepath] = audit_file(filepath, file_content)
+    return entries
+
+
+def split_batch_response(response, filepaths):
+    """
+    Split a batched audit response into {filepath: entry} on its "## <path>"
+    lines. Headings may wrap the path in backticks or give just the file
+    name when that is unambiguous; text under unknown headings stays with
+    the previous file.
+    """
+    by_name = {}
+    for filepath in filepaths:
+        by_name.setdefault(os.path.basename(filepath), []).append(filepath)
+    
+    sections = {}
+    current = None
+    for line in response.splitlines():
+        if line.startswith("## "):
+            heading = line[3:].strip().strip("`*").strip()
+            heading = heading[len("File:"):].strip() if heading.startswith("File:") else heading
+            named = by_name.get(os.path.basename(heading), [])
+            match = heading if heading in filepaths else (named[0] if len(named) == 1 else None)
+            if match:
+                current = match
+                sections.setdefault(current, [])
+                continue
+        if current:
+            sections[current].append(line)
+    
+    return {filepath: "\n".join(lines).strip() for filepath, lines in sections.items()}
+
+
+def audit_version():
+    """Identifies the prompts and agent entries were extracted with; changing any invalidates the ledger."""
+    return hashlib.sha256(f"auggie\n{AUDIT_PROMPT}\n{AUDIT_BATCH_PROMPT}".encode("utf-8")).hexdigest()[:12]
+
+
+def load_audit_ledger():
+    """Per-file audit results ({path: {sha256, version, entry, audited_at}})."""
+    try:
+        with open(AUDIT_LEDGER, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (FileNotFoundError, json.JSONDecodeError):
+        return {}
+
+
+def save_audit_ledger(ledger):
+    os.makedirs(os.path.dirname(AUDIT_LEDGER), exist_ok=True)
+    tmp_path = f"{AUDIT_LEDGER}.tmp"
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(ledger, f, indent=1, sort_keys=True)
+    os.replace(tmp_path, AUDIT_LEDGER)
+
+
+def write_audit_block(output_file, target_dir, content):
+    """Replace target_dir's block from a previous audit in output_file, or append a new one."""
+    start_marker = f"<!-- Extracted from {target_dir} -->\n"
+    end_marker = f"<!-- End of extraction from {target_dir} -->\n"
+    block = f"\n---\n{start_marker}{content}\n{end_marker}"
+    
+    existing = ""
+    if os.path.exists(output_file):
+        with open(output_file, 'r') as f:
+            existing = f.read()
+    
+    start = existing.find(f"\n---\n{start_marker}")
+    end = existing.find(end_marker, start) if start >= 0 else -1
+    if end >= 0:
+        existing = existing[:start] + block + existing[end + len(end_marker):]
+    else:
+        existing += block
+    
+    with open(output_file, 'w') as f:
+        f.write(existing)
 
 
+@tracing.traced("genesis", "phase")
 def run_genesis(tech_stack):
     """
     WORKFLOW B: Define standards from scratch via reference implementation.
@@ -226,6 +482,7 @@ Output ONLY the markdown rules document.
     print(f"✅ Patterns saved to: {STANDARDS_FILES['patterns']}")
 
 
+@tracing.traced("freeze", "phase")
 def flag_and_freeze(component_name):
     """
     WORKFLOW C: Create a new component and freeze it as a standard.
@@ -311,45 +568,66 @@ Format:
 
 
 def main():
-    if len(sys.argv) < 2:
+    argv = [a for a in sys.argv if a not in OPTION_FLAGS]
+    numbers = {"--workers": AUDIT_WORKERS, "--batch-tokens": AUDIT_BATCH_TOKENS}
+    for option in numbers:
+        if option in argv:
+            i = argv.index(option)
+            try:
+                numbers[option] = int(argv[i + 1])
+            except (IndexError, ValueError):
+                print(f"❌ {option} needs a number")
+                sys.exit(1)
+            del argv[i:i + 2]
+    LLM_CACHE.mode = mode_from_flags("--no-cache" in sys.argv, "--refresh" in sys.argv)
+    if "--profile" in sys.argv:
+        print(f"⏱️  Tracing to {tracing.start('standards')}")
+    
+    if len(argv) < 2:
         print("Usage:")
         print("  python scripts/standards.py audit <directory> [file_pattern]")
         print("  python scripts/standards.py genesis <tech_stack>")
         print("  python scripts/standards.py freeze <component_name>")
+        print("Options: --refresh, --no-cache, --profile, --workers N and --batch-tokens N (audit)")
         sys.exit(1)
     
     ensure_standards_dir()
     
-    mode = sys.argv[1].lower()
+    mode = argv[1].lower()
     
     if mode == "audit":
-        if len(sys.argv) < 3:
+        if len(argv) < 3:
             print("❌ Missing argument: directory path")
             sys.exit(1)
-        target_dir = sys.argv[2]
-        file_pattern = sys.argv[3] if len(sys.argv) > 3 else "*"
-        audit_directory(target_dir, file_pattern)
+        target_dir = argv[2]
+        file_pattern = argv[3] if len(argv) > 3 else "*"
+        audit_directory(target_dir, file_pattern, numbers["--workers"], numbers["--batch-tokens"])
     
     elif mode == "genesis":
-        if len(sys.argv) < 3:
+        if len(argv) < 3:
             print("❌ Missing argument: tech stack description")
             sys.exit(1)
-        tech_stack = " ".join(sys.argv[2:])
+        tech_stack = " ".join(argv[2:])
         run_genesis(tech_stack)
     
     elif mode == "freeze":
-        if len(sys.argv) < 3:
+        if len(argv) < 3:
             print("❌ Missing argument: component name")
             sys.exit(1)
-        component_name = " ".join(sys.argv[2:])
+        component_name = " ".join(argv[2:])
         flag_and_freeze(component_name)
     
     else:
         print(f"❌ Unknown mode: {mode}")
         print("Valid modes: audit, genesis, freeze")
         sys.exit(1)
+    
+    print(f"\n💾 {LLM_CACHE.summary()}")
 
 
 if __name__ == "__main__":
-    main()
+    try:
+        main()
+    except AgentCallError:
+        sys.exit(1)
 
@@ -0,0 +1,277 @@
+#!/usr/bin/env python3
+"""
+Zero Ambiguity Tracing
+
+Nested timing spans for orchestrator.py, executor.py and standards.py,
+written as JSON lines when a script runs with --profile.
+
+Every span records its name, kind (run / phase / stage / agent), parent,
+duration and attributes such as prompt/response byte counts and cache
+hits. Spans nest through contextvars, so they follow asyncio tasks; use
+bind() for work handed to a thread pool. Detached executor workers append
+to the same trace file under the span that spawned them (see child_env).
+
+When tracing is off, span() is a no-op and costs one flag check.
+
+Usage:
+    python scripts/tracing.py <trace.jsonl>    # Summarize a trace
+"""
+
+import atexit
+import contextvars
+import functools
+import json
+import os
+import sys
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+from datetime import datetime
+
+TRACE_ENV = "ZA_TRACE_FILE"
+TRACE_ID_ENV = "ZA_TRACE_ID"
+PARENT_ENV = "ZA_TRACE_PARENT"
+DEFAULT_TRACE_DIR = os.path.join("context-engine", ".cache", "traces")
+
+_current = contextvars.ContextVar("za_trace_span", default=None)
+_state = {"path": None, "trace_id": None, "root": None, "open": {}}
+_write_lock = threading.Lock()
+
+
+class Span:
+    """One timed unit of work. Add attributes with set()."""
+
+    def __init__(self, name: str, kind: str, parent_id: str | None, attrs: dict):
+        self.name = name
+        self.kind = kind
+        self.span_id = uuid.uuid4().hex[:12]
+        self.parent_id = parent_id
+        self.attrs = attrs
+        self.start = time.time()
+        self.perf_start = time.perf_counter()
+
+    def set(self, **attrs):
+        self.attrs.update(attrs)
+
+
+class _NullSpan:
+    def set(self, **attrs):
+        pass
+
+
+NULL_SPAN = _NullSpan()
+
+
+def enabled() -> bool:
+    return _state["path"] is not None
+
+
+def _write(record: dict):
+    line = json.dumps(record, default=str) + "\n"
+    with _write_lock, open(_state["path"], "a", encoding="utf-8") as f:
+        f.write(line)
+
+
+def begin(name: str, kind: str = "stage", **attrs) -> Span | _NullSpan:
+    """Open a span under the current one and make it current. Close it with end()."""
+    if not enabled():
+        return NULL_SPAN
+    parent = _current.get()
+    span_obj = Span(name, kind, parent.span_id if parent else os.environ.get(PARENT_ENV), attrs)
+    span_obj.token = _current.set(span_obj)
+    _state["open"][span_obj.span_id] = span_obj
+    return span_obj
+
+
+def end(span_obj, **attrs):
+    """Close a span opened by begin() and record it."""
+    if span_obj is NULL_SPAN or not enabled() or span_obj.span_id not in _state["open"]:
+        return
+    del _state["open"][span_obj.span_id]
+    span_obj.set(**attrs)
+    try:
+        _current.reset(span_obj.token)
+    except ValueError:
+        _current.set(None)  # closed from another context (e.g. at exit)
+    _write({
+        "trace": _state["trace_id"],
+        "span": span_obj.span_id,
+        "parent": span_obj.parent_id,
+        "name": span_obj.name,
+        "kind": span_obj.kind,
+        "start": datetime.utcfromtimestamp(span_obj.start).isoformat() + "Z",
+        "duration_ms": round((time.perf_counter() - span_obj.perf_start) * 1000, 3),
+        "pid": os.getpid(),
+        "attrs": span_obj.attrs,
+    })
+
+
+@contextmanager
+def span(name: str, kind: str = "stage", **attrs):
+    """Time the enclosed block as a span nested under the current one."""
+    if not enabled():
+        yield NULL_SPAN
+        return
+    span_obj = begin(name, kind, **attrs)
+    try:
+        yield span_obj
+    except BaseException as e:
+        span_obj.set(error=type(e).__name__)
+        raise
+    finally:
+        end(span_obj)
+
+
+def traced(name: str, kind: str = "stage"):
+    """Decorator: run the function inside a span (attributes via annotate())."""
+    def decorator(fn):
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            if not enabled():
+                return fn(*args, **kwargs)
+            with span(name, kind):
+                return fn(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def annotate(**attrs):
+    """Add attributes to the current span, if tracing."""
+    current = _current.get()
+    if current is not None and enabled():
+        current.set(**attrs)
+
+
+def bind(fn):
+    """Wrap fn so it runs under the current span when called from another thread."""
+    ctx = contextvars.copy_context()
+    return lambda *args, **kwargs: ctx.copy().run(fn, *args, **kwargs)
+
+
+def child_env() -> dict:
+    """Environment variables that make a child process trace under the current span."""
+    if not enabled():
+        return {}
+    parent = _current.get()
+    return {TRACE_ENV: _state["path"], TRACE_ID_ENV: _state["trace_id"],
+            **({PARENT_ENV: parent.span_id} if parent else {})}
+
+
+def enable(path: str, trace_id: str | None = None):
+    """Record spans to path (appending)."""
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    _state["path"] = path
+    _state["trace_id"] = trace_id or uuid.uuid4().hex[:12]
+
+
+def enable_from_env():
+    """Join the parent process's trace if it passed one through child_env()."""
+    if os.environ.get(TRACE_ENV):
+        enable(os.environ[TRACE_ENV], trace_id=os.environ.get(TRACE_ID_ENV))
+
+
+def start(script: str, trace_dir: str = DEFAULT_TRACE_DIR, **attrs) -> str:
+    """
+    Start a profiled run: open a root span for the script and print a
+    summary when the process exits (also on sys.exit).
+
+    Returns:
+        The trace file path.
+    """
+    path = os.path.join(trace_dir, f"{script}-{time.strftime('%Y%m%d-%H%M%S')}-{os.getpid()}.jsonl")
+    enable(path)
+    _state["root"] = begin(script, "run", argv=sys.argv[1:], **attrs)
+    atexit.register(finish)
+    return path
+
+
+def finish():
+    """Close any spans still open, then print the trace summary."""
+    if not enabled() or _state["root"] is None:
+        return
+    for span_obj in reversed(list(_state["open"].values())):
+        end(span_obj, **({} if span_obj is _state["root"] else {"incomplete": True}))
+    _state["root"] = None
+    print_summary(_state["path"])
+
+
+# --- SUMMARY REPORT ---
+
+def load_spans(path: str) -> list[dict]:
+    spans = []
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            try:
+                spans.append(json.loads(line))
+            except json.JSONDecodeError:
+                continue  # partial line from a killed worker
+    return spans
+
+
+def percentile(values: list[float], pct: float) -> float:
+    ordered = sorted(values)
+    return ordered[max(0, min(len(ordered) - 1, int(len(ordered) * pct / 100 + 0.5) - 1))]
+
+
+def summarize(spans: list[dict]) -> list[dict]:
+    """Aggregate spans by (kind, name), slowest total first."""
+    groups = {}
+    for s in spans:
+        groups.setdefault((s["kind"], s["name"]), []).append(s)
+
+    rows = []
+    for (kind, name), members in groups.items():
+        durations = [s["duration_ms"] for s in members]
+        attrs = [s.get("attrs", {}) for s in members]
+        rows.append({
+            "kind": kind,
+            "name": name,
+            "count": len(members),
+            "total_ms": sum(durations),
+            "p50_ms": percentile(durations, 50),
+            "p95_ms": percentile(durations, 95),
+            "max_ms": max(durations),
+            "prompt_bytes": sum(a.get("prompt_bytes") or 0 for a in attrs),
+            "response_bytes": sum(a.get("response_bytes") or 0 for a in attrs),
+            "cache_hits": sum(1 for a in attrs if a.get("cache") == "hit"),
+            "errors": sum(1 for a in attrs if a.get("error")),
+        })
+    rows.sort(key=lambda r: -r["total_ms"])
+    return rows
+
+
+def print_summary(path: str, top: int = 5):
+    """Print per-span-name totals and the slowest individual spans of a trace."""
+    spans = load_spans(path)
+    if not spans:
+        print(f"\n⏱️  No spans recorded in {path}")
+        return
+
+    print("\n" + "=" * 60)
+    print(f"⏱️  PROFILE ({len(spans)} spans) - {path}")
+    print("=" * 60)
+    print(f"  {'kind':<7} {'name':<28} {'count':>5} {'total s':>9} {'p50 ms':>9} {'p95 ms':>9} {'KB in/out':>13}")
+    for r in summarize(spans):
+        io = f"{r['prompt_bytes'] // 1024}/{r['response_bytes'] // 1024}" if r["prompt_bytes"] or r["response_bytes"] else ""
+        notes = "".join([
+            f"  ⚡{r['cache_hits']}" if r["cache_hits"] else "",
+            f"  ❌{r['errors']}" if r["errors"] else "",
+        ])
+        print(f"  {r['kind']:<7} {r['name'][:28]:<28} {r['count']:>5} {r['total_ms'] / 1000:>9.2f} "
+              f"{r['p50_ms']:>9.1f} {r['p95_ms']:>9.1f} {io:>13}{notes}")
+
+    slowest = sorted((s for s in spans if s["kind"] != "run"), key=lambda s: -s["duration_ms"])[:top]
+    if slowest:
+        print("\n  Slowest spans:")
+        for s in slowest:
+            label = ", ".join(f"{k}={v}" for k, v in s.get("attrs", {}).items()
+                              if k in ("ticket", "job", "agent", "file", "role", "cache"))
+            print(f"    {s['duration_ms'] / 1000:8.2f}s  {s['name']}" + (f" ({label})" if label else ""))
+
+
+if __name__ == "__main__":
+    if len(sys.argv) != 2:
+        print("Usage: python scripts/tracing.py <trace.jsonl>")
+        sys.exit(1)
+    print_summary(sys.argv[1])